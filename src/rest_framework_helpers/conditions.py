@@ -0,0 +1,35 @@
+class BaseCondition:
+    """
+    Decides whether a field is included in the output of a ConditionalFieldsMixin
+    serializer.
+
+    Set request_scoped to True when the result only depends on the request. It is then
+    computed once per request with has_request_condition.
+
+    Set requires_value to False when the serialized value is not needed. The field is
+    then checked with has_field_condition and is never serialized if it fails.
+    Otherwise, has_object_condition is called with the serialized value.
+    """
+
+    request_scoped = False
+    requires_value = True
+
+    def has_request_condition(self, request):
+        return True
+
+    def has_field_condition(self, field_name, obj, request):
+        return True
+
+    def has_object_condition(self, field_name, value, obj, representation, request):
+        return True
+
+
+class IsStaffCondition(BaseCondition):
+    """
+    Returns True if the requesting user is staff.
+    """
+
+    request_scoped = True
+
+    def has_request_condition(self, request):
+        return getattr(request.user, "is_staff", False) is True
@@ -1,5 +1,10 @@
 import six
 import pytz
+from copy import copy
+from urllib.parse import unquote, urlparse
+from django.db.models import Model
+from django.db.models.fields.files import FieldFile
+from django.db.models.signals import post_save, post_delete
 from django.shortcuts import get_object_or_404
 from rest_framework.serializers import (
     Field,
@@ -12,32 +17,100 @@ from rest_framework.serializers import (
     ListSerializer,
 )
 
-from .mixins import ParameterisedFieldMixin
+from .mixins import CompiledURLMixin, ParameterisedFieldMixin
+from .utils import LRUCache
 
 
 class LoadableImageField(ImageField):
     """
     An ImageField that can be passed an existing imagefield url, and therefore can be
     used in updates without requiring a file upload.
+
+    The url is converted back into a storage name and looked up with a single query.
+    Recently resolved urls are kept in a bounded cache that is cleared whenever an
+    instance of the model is saved or deleted.
     """
 
+    url_cache_size = 256
+    url_caches = {}
+
+    def __init__(self, *args, **kwargs):
+        self.url_cache_size = kwargs.pop("url_cache_size", self.url_cache_size)
+        super().__init__(*args, **kwargs)
+
+    @classmethod
+    def clear_url_cache(cls, sender, **kwargs):
+        cache = cls.url_caches.get(sender)
+        if cache is not None:
+            cache.clear()
+
+    def get_url_cache(self, model):
+        cache = self.url_caches.get(model)
+        if cache is None:
+            cache = self.url_caches.setdefault(model, LRUCache(self.url_cache_size))
+            uid = "loadable_image_field_{}".format(model._meta.label_lower)
+            post_save.connect(self.clear_url_cache, sender=model, dispatch_uid=uid)
+            post_delete.connect(self.clear_url_cache, sender=model, dispatch_uid=uid)
+        return cache
+
+    def get_name_for_url(self, storage, data):
+        path = unquote(urlparse(data).path)
+        base_path = unquote(urlparse(storage.url("")).path)
+        if not path.startswith(base_path):
+            return None
+        name = path[len(base_path) :]
+        if not len(name):
+            return None
+        return name
+
     def get_field_for_url(self, data):
+        if not isinstance(data, str):
+            return None
         model = self.parent.Meta.model
-        queryset = model.objects.all()
-        for instance in queryset:
-            field = getattr(instance, self.field_name, None)
-            if field is not None:
-                url = getattr(field, "url", None)
-                if url is not None:
-                    if url in data:
-                        return field
+        cache = self.get_url_cache(model)
+        cache_key = (self.source, data)
+        field = cache.get(cache_key)
+        if field is not None:
+            return field
+        model_field = model._meta.get_field(self.source)
+        name = self.get_name_for_url(model_field.storage, data)
+        if name is None:
+            return None
+        instance = model._default_manager.filter(**{self.source: name}).first()
+        if instance is None:
+            return None
+        field = getattr(instance, self.source)
+        cache.set(cache_key, field)
+        return field
+
+    def get_trusted_file(self, data):
+        """
+        Returns the file already bound to the instance being updated when the url
+        points at it. Stored files were validated on upload, so no bytes are read.
+        """
+        instance = getattr(self.parent, "instance", None)
+        if not isinstance(instance, Model) or not isinstance(data, str):
+            return None
+        current = getattr(instance, self.source, None)
+        if not isinstance(current, FieldFile) or not current:
+            return None
+        if self.get_name_for_url(current.storage, data) != current.name:
+            return None
+        return current
 
     def to_internal_value(self, data):
         try:
             return super().to_internal_value(data)
         except ValidationError:
+            trusted = self.get_trusted_file(data)
+            if trusted is not None:
+                return trusted
             field = self.get_field_for_url(data)
-            return super().to_internal_value(field)
+            if field is None:
+                raise
+            # The cached file is already stored, so return a copy of it instead of
+            # re-validating it, which would read the file back from storage.
+            return copy(field)
 
 
 class TimezoneField(Field):
@@ -74,7 +147,7 @@ class ParameterisedHyperlinkedRelatedField(
         super().__init__(*args, **kwargs)
 
 
-class ParameterisedHyperlinkedIdentityField(HyperlinkedIdentityField):
+class ParameterisedHyperlinkedIdentityField(CompiledURLMixin, HyperlinkedIdentityField):
 
     # read_only = True
     lookup_fields = [("pk", "pk")]
@@ -94,19 +167,3 @@ class ParameterisedHyperlinkedIdentityField(HyperlinkedIdentityField):
                 lookup_field = lookup_field.replace(".", "__")
             lookup_kwargs[lookup_field] = view_kwargs[lookup_url_kwarg]
         return get_object_or_404(queryset, **lookup_kwargs)
-
-    def get_url(self, obj, view_name, request, format):
-        """
-        Given an object, return the URL that hyperlinks to the object.
-
-        May raise a `NoReverseMatch` if the `view_name` and `lookup_field`
-        attributes are not configured to correctly match the URL conf.
-        """
-        kwargs = {}
-        for model_field, url_param in self.lookup_fields:
-            attr = obj
-            for field in model_field.split("."):
-                attr = getattr(attr, field)
-            kwargs[url_param] = attr
-
-        return self.reverse(view_name, kwargs=kwargs, request=request, format=format)
@@ -1,14 +1,143 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import UniqueConstraint
+from rest_framework.exceptions import ValidationError
+
+
 class QuerystringFilter(object):
-    def get_querystring_filter(self):
-        field_names = self.get_field_names()
+    """
+    Filters the queryset with the query params that name an allowed field and lookup.
+
+    querystring_filter_fields maps field names (using __ for relations) to the lookups
+    allowed on them, or lists field names that only allow exact matches, eg.
+    {"name": ["exact", "in"], "created": ["gte", "lte"]}. When it isn't set, the names
+    from get_field_names() are used with exact matches.
+
+    Fields without an index are rejected with a 400 unless they are listed in
+    querystring_filter_unindexed_fields.
+    """
+
+    querystring_filter_fields = None
+    querystring_filter_unindexed_fields = []
+    querystring_filter_plans = {}
+    querystring_filter_list_separator = ","
+
+    def get_querystring_filter_fields(self):
+        fields = self.querystring_filter_fields
+        if fields is None:
+            fields = self.get_field_names()
+        if isinstance(fields, dict):
+            return tuple((name, tuple(lookups)) for name, lookups in fields.items())
+        return tuple((name, ("exact",)) for name in fields)
+
+    def get_indexed_field_names(self, model):
+        """
+        Returns the names of the fields that lead an index, so they can be searched
+        without a full scan.
+        """
+        meta = model._meta
+        names = set()
+        for field in meta.concrete_fields:
+            if field.primary_key or field.unique or field.db_index:
+                names.add(field.name)
+        for index in meta.indexes:
+            if len(index.fields):
+                names.add(index.fields[0].lstrip("-"))
+        for constraint in meta.constraints:
+            if isinstance(constraint, UniqueConstraint) and len(constraint.fields):
+                names.add(constraint.fields[0])
+        for fields in meta.unique_together:
+            names.add(fields[0])
+        for fields in getattr(meta, "index_together", ()):
+            names.add(fields[0])
+        return names
+
+    def get_querystring_filter_field(self, model, name):
+        """
+        Returns the model field at the end of a field path, and whether it's indexed.
+        """
+        field = None
+        for bit in name.split("__"):
+            if field is not None:
+                if field.related_model is None:
+                    # Only relations can be followed by another field name.
+                    return None, False
+                model = field.related_model
+            try:
+                field = model._meta.pk if bit == "pk" else model._meta.get_field(bit)
+            except FieldDoesNotExist:
+                return None, False
+        indexed = field.name in self.get_indexed_field_names(model)
+        return field, indexed
+
+    def get_querystring_filter_plan(self, model):
+        """
+        Returns a mapping of query param names to (field path, lookup, model field), and
+        the set of param names that are rejected because they have no index. It is
+        built once for each view class.
+        """
+        fields = self.get_querystring_filter_fields()
+        key = (self.__class__, model, fields)
+        try:
+            return self.querystring_filter_plans[key]
+        except KeyError:
+            pass
+        plan = {}
+        rejected = set()
+        for name, lookups in fields:
+            field, indexed = self.get_querystring_filter_field(model, name)
+            if field is None:
+                continue
+            for lookup in lookups:
+                params = [name] if lookup == "exact" else []
+                params.append("{}__{}".format(name, lookup))
+                for param in params:
+                    if indexed or name in self.querystring_filter_unindexed_fields:
+                        plan[param] = (name, lookup, field)
+                    else:
+                        rejected.add(param)
+        result = self.querystring_filter_plans[key] = (plan, rejected)
+        return result
+
+    def to_querystring_filter_value(self, field, lookup, value):
+        if field.is_relation:
+            field = field.target_field
+        if lookup == "isnull":
+            return value.lower() in ("1", "true", "yes")
+        if lookup in ("in", "range"):
+            values = value.split(self.querystring_filter_list_separator)
+            if lookup == "range" and len(values) != 2:
+                raise DjangoValidationError("Expected two values.")
+            return [field.to_python(x) for x in values]
+        if lookup in ("contains", "icontains", "startswith", "istartswith"):
+            return value
+        return field.to_python(value)
+
+    def get_querystring_filter(self, model=None):
+        if model is None:
+            model = super().get_queryset().model
+        plan, rejected = self.get_querystring_filter_plan(model)
         filter_kwargs = {}
-        for key, value in self.request.query_params.iteritems():
-            if key in field_names:
-                filter_kwargs[key] = value
+        errors = {}
+        for key, value in self.request.query_params.items():
+            if key in rejected:
+                errors[key] = ["Filtering on this field is not allowed."]
+                continue
+            if key not in plan:
+                continue
+            name, lookup, field = plan[key]
+            try:
+                value = self.to_querystring_filter_value(field, lookup, value)
+            except DjangoValidationError as e:
+                errors[key] = e.messages
+                continue
+            filter_kwargs["{}__{}".format(name, lookup)] = value
+        if len(errors):
+            raise ValidationError(errors)
         return filter_kwargs
 
     def get_queryset(self):
         queryset = super().get_queryset()
-        querystring_filter = self.get_querystring_filter()
+        querystring_filter = self.get_querystring_filter(queryset.model)
         queryset = queryset.filter(**querystring_filter)
         return queryset
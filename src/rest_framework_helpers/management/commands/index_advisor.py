@@ -0,0 +1,287 @@
+import os
+import re
+import sysconfig
+from collections import OrderedDict
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management.base import BaseCommand
+from django.db import migrations
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+from django.db.models import Index, UniqueConstraint
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from ...filters import QuerystringFilter
+from ...mixins import (
+    ExcludeKwargsMixin,
+    MultipleFieldLookupMixin,
+    OrderByFieldNameMixin,
+    ParameterisedViewMixin,
+)
+from ...pagination import KeysetPagination
+
+
+def get_view_classes(patterns, found=None):
+    """
+    Returns the view classes for every pattern in the URLconf, in order.
+    """
+    if found is None:
+        found = OrderedDict()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            get_view_classes(pattern.url_patterns, found)
+        elif isinstance(pattern, URLPattern):
+            callback = pattern.callback
+            view_class = getattr(callback, "cls", getattr(callback, "view_class", None))
+            if view_class is not None:
+                found[view_class] = True
+    return list(found)
+
+
+def resolve_field_path(model, path):
+    """
+    Returns the model and field at the end of a lookup path, ignoring any trailing
+    lookups, or None when the path ends in a relation that can't be indexed there.
+    """
+    field = None
+    for bit in path.split("__"):
+        if field is not None:
+            if not field.is_relation:
+                break
+            model = field.related_model
+        try:
+            field = model._meta.pk if bit == "pk" else model._meta.get_field(bit)
+        except FieldDoesNotExist:
+            if field is None:
+                return None
+            break
+    if field is None or not field.concrete or field.many_to_many:
+        return None
+    return model, field
+
+
+def get_existing_indexes(model):
+    """
+    Returns the leading columns of every index on the model.
+    """
+    meta = model._meta
+    indexes = []
+    for field in meta.concrete_fields:
+        if field.primary_key or field.unique or field.db_index:
+            indexes.append([field.name])
+    for index in meta.indexes:
+        indexes.append([x.lstrip("-") for x in index.fields])
+    for constraint in meta.constraints:
+        if isinstance(constraint, UniqueConstraint):
+            indexes.append(list(constraint.fields))
+    for fields in meta.unique_together:
+        indexes.append(list(fields))
+    for fields in getattr(meta, "index_together", ()):
+        indexes.append(list(fields))
+    return indexes
+
+
+def get_migrated_indexes(state, model):
+    """
+    Returns the columns of the indexes added by migrations, which may not be in the
+    model's Meta yet.
+    """
+    key = (model._meta.app_label, model._meta.model_name)
+    model_state = state.models.get(key, None)
+    if model_state is None:
+        return []
+    indexes = model_state.options.get("indexes", [])
+    return [[x.lstrip("-") for x in index.fields] for index in indexes]
+
+
+def is_covered(model, fields, state=None):
+    names = [x.lstrip("-") for x in fields]
+    indexes = get_existing_indexes(model)
+    if state is not None:
+        indexes += get_migrated_indexes(state, model)
+    for index in indexes:
+        if index[: len(names)] == names:
+            return True
+    return False
+
+
+def is_project_app(app_config):
+    """
+    Returns whether the app's code belongs to the project, rather than an installed
+    package.
+    """
+    path = os.path.realpath(app_config.path)
+    paths = sysconfig.get_paths()
+    for name in ("purelib", "platlib", "stdlib"):
+        lib = os.path.realpath(paths[name])
+        if path.startswith(lib + os.sep):
+            return False
+    parts = path.split(os.sep)
+    return "site-packages" not in parts and "dist-packages" not in parts
+
+
+def get_query_shapes(view_class):
+    """
+    Returns the (reason, field paths) for each query shape the view declares.
+    """
+    shapes = []
+    if issubclass(view_class, ParameterisedViewMixin):
+        paths = [x[0].replace(".", "__") for x in view_class.lookup_fields]
+        shapes.append(("lookup_fields", paths))
+    elif issubclass(view_class, MultipleFieldLookupMixin):
+        shapes.append(("lookup_fields", list(view_class.lookup_fields)))
+
+    exclude = []
+    if issubclass(view_class, ExcludeKwargsMixin):
+        exclude = list(view_class.exclude_kwargs.keys())
+    order = None
+    if issubclass(view_class, OrderByFieldNameMixin):
+        order = view_class.order_by_field_name
+    if len(exclude):
+        shapes.append(("exclude_kwargs", exclude))
+    if order is not None:
+        paths = [order]
+        pagination_class = getattr(view_class, "pagination_class", None)
+        is_keyset = isinstance(pagination_class, type) and issubclass(
+            pagination_class, KeysetPagination
+        )
+        if is_keyset and order.lstrip("-") != "pk":
+            paths.append("{}pk".format("-" if order.startswith("-") else ""))
+        shapes.append(("order_by_field_name", paths))
+
+    if issubclass(view_class, QuerystringFilter):
+        fields = view_class.querystring_filter_fields or []
+        for name in fields:
+            shapes.append(("querystring_filter_fields", [name]))
+    return shapes
+
+
+def get_index_fields(model, paths):
+    """
+    Returns the index columns for the paths on the model, and the single column
+    indexes needed on related models for paths that follow a relation.
+    """
+    local = []
+    related = []
+    for path in paths:
+        prefix = "-" if path.startswith("-") else ""
+        resolved = resolve_field_path(model, path.lstrip("-"))
+        if resolved is None:
+            continue
+        field_model, field = resolved
+        if field_model is model:
+            # The pk is only worth adding after another column.
+            if len(local) or not field.primary_key:
+                local.append(prefix + field.name)
+        else:
+            related.append((field_model, [prefix + field.name]))
+    return local, related
+
+
+class Command(BaseCommand):
+    help = (
+        "Reports the indexes that the viewsets in the URLconf need for their "
+        "lookup_fields, order_by_field_name, exclude_kwargs and querystring filters."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--urlconf", default=None, help="The URLconf to inspect.")
+        parser.add_argument(
+            "--write",
+            action="store_true",
+            help="Write a migration with the missing indexes for each project app.",
+        )
+        parser.add_argument(
+            "--app",
+            action="append",
+            dest="apps",
+            default=[],
+            help="Only write migrations for this app label. Can be repeated.",
+        )
+
+    def get_suggestions(self, urlconf):
+        suggestions = OrderedDict()
+        for view_class in get_view_classes(get_resolver(urlconf).url_patterns):
+            queryset = getattr(view_class, "queryset", None)
+            model = getattr(queryset, "model", None)
+            if model is None:
+                continue
+            for reason, paths in get_query_shapes(view_class):
+                local, related = get_index_fields(model, paths)
+                needed = list(related)
+                if len(local):
+                    needed.append((model, local))
+                for needed_model, fields in needed:
+                    key = (needed_model, tuple(fields))
+                    reasons = suggestions.setdefault(key, [])
+                    reasons.append("{}.{}".format(view_class.__name__, reason))
+        return suggestions
+
+    def can_write_migration(self, app_label, app_labels):
+        if len(app_labels):
+            return app_label in app_labels
+        return is_project_app(apps.get_app_config(app_label))
+
+    def write_migrations(self, loader, missing, app_labels):
+        operations = OrderedDict()
+        for model, fields in missing:
+            index = Index(fields=list(fields))
+            index.set_name_with_model(model)
+            operation = migrations.AddIndex(
+                model_name=model._meta.model_name, index=index
+            )
+            operations.setdefault(model._meta.app_label, []).append(operation)
+
+        for app_label, app_operations in operations.items():
+            if not self.can_write_migration(app_label, app_labels):
+                self.stderr.write(
+                    "Skipped {}, which is not part of the project. Pass --app {} to "
+                    "write it.".format(app_label, app_label)
+                )
+                continue
+            if app_label not in loader.migrated_apps:
+                self.stderr.write(
+                    "Skipped {}, which has no migrations.".format(app_label)
+                )
+                continue
+            leaf_nodes = loader.graph.leaf_nodes(app_label)
+            number = 1
+            for _, name in leaf_nodes:
+                match = re.match(r"^\d+", name)
+                if match:
+                    number = max(number, int(match.group()) + 1)
+            migration = migrations.Migration(
+                "{:04d}_index_advisor".format(number), app_label
+            )
+            migration.dependencies = list(leaf_nodes)
+            migration.operations = app_operations
+            writer = MigrationWriter(migration)
+            with open(writer.path, "w") as f:
+                f.write(writer.as_string())
+            self.stdout.write(
+                "Wrote {}. Add the same indexes to Meta.indexes.".format(
+                    os.path.relpath(writer.path)
+                )
+            )
+
+    def handle(self, *args, **options):
+        suggestions = self.get_suggestions(options["urlconf"])
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        state = loader.project_state()
+        missing = []
+        for (model, fields), reasons in suggestions.items():
+            covered = is_covered(model, fields, state)
+            status = "ok" if covered else "missing"
+            line = "{}: [{}] {} ({})".format(
+                model._meta.label, ", ".join(fields), status, ", ".join(reasons)
+            )
+            if covered:
+                self.stdout.write(line)
+            else:
+                self.stdout.write(self.style.WARNING(line))
+                missing.append((model, fields))
+
+        if not len(missing):
+            self.stdout.write(self.style.SUCCESS("No missing indexes."))
+        elif options["write"]:
+            self.write_migrations(loader, missing, options["apps"])
@@ -6,13 +6,41 @@ https://stackoverflow.com/questions/32038643/custom-hyperlinked-url-field-for-mo
 https://stackoverflow.com/questions/43964007/django-rest-framework-get-or-create-for-primarykeyrelatedfield
 """
 from rest_framework.fields import SkipField
-from rest_framework.relations import PKOnlyObject
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.permissions import BasePermission, SAFE_METHODS
+from rest_framework.validators import UniqueValidator
+from rest_framework.relations import (
+    PKOnlyObject,
+    RelatedField,
+    ManyRelatedField,
+    MANY_RELATION_KWARGS,
+)
+import copy
+import time
 from collections import OrderedDict
-from django.core.exceptions import ObjectDoesNotExist, MultipleObjectsReturned
+from collections.abc import Mapping
+from hashlib import md5
+from operator import attrgetter
+from urllib.parse import unquote, urlparse
+from django.core.exceptions import (
+    ObjectDoesNotExist,
+    MultipleObjectsReturned,
+    FieldDoesNotExist,
+    ImproperlyConfigured,
+)
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Model, QuerySet
+from django.db.models.signals import post_save, post_delete
 from django.shortcuts import get_object_or_404
 from django.conf import settings
-from django.http import Http404
+from django.http import Http404, QueryDict
+from django.urls import get_script_prefix, resolve, Resolver404
+from django.utils.encoding import uri_to_iri
 from rest_framework.serializers import (
+    BaseSerializer,
     Field,
     HyperlinkedRelatedField,
     HyperlinkedIdentityField,
@@ -41,31 +69,107 @@ from .utils import (
     HashableDict,
     # get_nested,
     DictDiffer,
+    build_compiled_url,
+    get_compiled_url,
+    get_objects_for_lookups,
+    has_unique_constraint,
+    bulk_upsert,
+    LRUCache,
 )
 
 
 class RepresentationMixin:
-    def to_representation(self, instance, *args, **kwargs):
-        ret = OrderedDict()
-        fields = self._readable_fields
+    """
+    Serializes fields that read a concrete model column through a plan that is built
+    once per serializer class, instead of going through get_attribute for every field
+    of every row. Other fields use the generic path.
+    """
 
-        for field in fields:
-            try:
-                obj = field.get_attribute(instance)
-            except SkipField:
-                continue
+    representation_plans = {}
 
-            check_for_none = obj.pk if isinstance(obj, PKOnlyObject) else obj
-            if check_for_none is None:
-                representation = None
-            else:
-                representation = self.to_representation_for_field(
-                    field, obj, *args, **kwargs
-                )
+    def get_plain_field_getter(self, field):
+        """
+        Returns an attribute getter for fields that read a concrete model column, and
+        therefore never raise SkipField. Returns None for every other field.
+        """
+        model = getattr(getattr(self, "Meta", None), "model", None)
+        if model is None:
+            return None
+        overridden = (
+            type(self).to_representation_for_field
+            is not RepresentationMixin.to_representation_for_field
+        )
+        if overridden or type(field).get_attribute is not Field.get_attribute:
+            return None
+        if len(field.source_attrs) != 1:
+            return None
+        attnames = [x.attname for x in model._meta.concrete_fields]
+        if field.source_attrs[0] not in attnames:
+            return None
+        return attrgetter(field.source_attrs[0])
+
+    def get_representation_plan(self):
+        """
+        Returns a list of (field, getter, converter) for the readable fields. The plan
+        is rebuilt only when the serializer's fields change.
+        """
+        fields = self.fields
+        plan = getattr(self, "_representation_plan", None)
+        if plan is not None and plan[0] is fields and plan[1] == len(fields):
+            return plan[2]
+
+        getters = self.representation_plans.setdefault(type(self), {})
+        steps = []
+        for field in self.get_representation_fields():
+            key = (field.field_name, field.source, type(field))
+            if key not in getters:
+                getters[key] = self.get_plain_field_getter(field)
+            steps.append((field, getters[key], field.to_representation))
+        self._representation_plan = (fields, len(fields), steps)
+        return steps
+
+    def get_representation_fields(self):
+        """
+        Returns the readable fields that are included in the plan.
+        """
+        return list(self._readable_fields)
+
+    def filter_representation_plan(self, steps, instance):
+        """
+        Returns the steps to serialize for the instance. Fields removed here are never
+        serialized.
+        """
+        return steps
+
+    def to_representation(self, instance, *args, **kwargs):
+        model = getattr(getattr(self, "Meta", None), "model", None)
+        use_getters = not args and not kwargs and model is not None
+        use_getters = use_getters and isinstance(instance, model)
+        steps = self.get_representation_plan()
+        steps = self.filter_representation_plan(steps, instance)
 
-            ret[field.field_name] = representation
+        ret = OrderedDict()
+        for field, getter, converter in steps:
+            if getter is None or use_getters is False:
+                try:
+                    ret[field.field_name] = self.to_representation_field(
+                        field, instance, *args, **kwargs
+                    )
+                except SkipField:
+                    continue
+            else:
+                obj = getter(instance)
+                ret[field.field_name] = None if obj is None else converter(obj)
         return ret
 
+    def to_representation_field(self, field, instance, *args, **kwargs):
+        obj = field.get_attribute(instance)
+
+        check_for_none = obj.pk if isinstance(obj, PKOnlyObject) else obj
+        if check_for_none is None:
+            return None
+        return self.to_representation_for_field(field, obj, *args, **kwargs)
+
     def to_representation_for_field(self, field, obj, *args, **kwargs):
         return field.to_representation(obj, *args, **kwargs)
 
@@ -73,10 +177,64 @@ class RepresentationMixin:
 class ConditionalFieldsMixin(RepresentationMixin):
     """
     Returns serializer fields if conditions pass.
+
+    Conditions that are request scoped, or that do not require the serialized value,
+    are checked before the field is serialized. See BaseCondition.
     """
 
     conditional_fields = None
 
+    def get_conditions(self, field_name):
+        """
+        Returns the condition instances for the field, created once per serializer.
+        """
+        conditions = getattr(self, "_conditions", None)
+        if conditions is None:
+            conditions = self._conditions = {}
+        if field_name not in conditions:
+            if field_name in self.conditional_fields:
+                condition_classes = self.conditional_fields[field_name]
+            else:
+                condition_classes = self.conditional_fields.get("default", [])
+            conditions[field_name] = [c() for c in condition_classes]
+        return conditions[field_name]
+
+    def get_request_condition(self, condition, request):
+        """
+        Returns the result of a request scoped condition, computed once per request.
+        """
+        results = getattr(request, "_request_condition_results", None)
+        if results is None:
+            results = request._request_condition_results = {}
+        key = condition.__class__
+        if key not in results:
+            results[key] = condition.has_request_condition(request)
+        return results[key]
+
+    def has_field_conditions(self, field_name, obj, request):
+        for condition in self.get_conditions(field_name):
+            if getattr(condition, "request_scoped", False) is True:
+                result = self.get_request_condition(condition, request)
+            elif getattr(condition, "requires_value", True) is True:
+                continue
+            else:
+                result = condition.has_field_condition(field_name, obj, request)
+            if result is False:
+                return False
+        return True
+
+    def filter_representation_plan(self, steps, instance):
+        steps = super().filter_representation_plan(steps, instance)
+        if self.conditional_fields is None:
+            return steps
+
+        request = self.context["request"]
+        return [
+            step
+            for step in steps
+            if self.has_field_conditions(step[0].field_name, instance, request)
+        ]
+
     def filter_conditional_fields(self, representation, obj):
         if self.conditional_fields is None:
             return representation
@@ -84,24 +242,18 @@ class ConditionalFieldsMixin(RepresentationMixin):
         new_rep = OrderedDict()
         request = self.context["request"]
         for k, v in representation.items():
-            if k in self.conditional_fields:
-                condition_classes = self.conditional_fields[k]
-                conditions = [c() for c in condition_classes]
-                results = [
-                    c.has_object_condition(k, v, obj, representation, request)
-                    for c in conditions
-                ]
-                if any([x is False for x in results]):
-                    continue
-            elif "default" in self.conditional_fields:
-                condition_classes = self.conditional_fields["default"]
-                conditions = [c() for c in condition_classes]
-                results = [
-                    c.has_object_condition(k, v, obj, representation, request)
-                    for c in conditions
-                ]
-                if any([x is False for x in results]):
-                    continue
+            conditions = [
+                c
+                for c in self.get_conditions(k)
+                if getattr(c, "request_scoped", False) is False
+                and getattr(c, "requires_value", True) is True
+            ]
+            results = [
+                c.has_object_condition(k, v, obj, representation, request)
+                for c in conditions
+            ]
+            if any([x is False for x in results]):
+                continue
             new_rep[k] = v
         return new_rep
 
@@ -114,6 +266,9 @@ class ConditionalFieldsMixin(RepresentationMixin):
 class ExplicitFieldsMixin(RepresentationMixin):
     """
     Remove all non-specified fields from the serializer output.
+
+    The requested fields are parsed once per serializer, and the other fields are
+    removed from the representation plan before any row is serialized.
     """
 
     explicit_fields_query_param = "fields"
@@ -151,34 +306,389 @@ class ExplicitFieldsMixin(RepresentationMixin):
 
     @property
     def explicit_fields(self):
+        cached = getattr(self, "_explicit_fields", None)
+        if cached is not None:
+            return cached
+
         paths_allowed = self.explicit_field_paths_allowed
         paths_requested = self.explicit_field_paths_requested
 
         implicit_param = self.implicit_fields_query_param_value
         all_paths = self.get_explicit_field_path(implicit_param)
-        if all_paths in paths_requested:
-            if self.implicit_fields_allowed is True:
-                return paths_allowed
-
-        results = []
-        for path_requested in paths_requested:
-            if path_requested in paths_allowed:
-                results.append(path_requested)
+        if all_paths in paths_requested and self.implicit_fields_allowed is True:
+            results = paths_allowed
+        else:
+            results = []
+            for path_requested in paths_requested:
+                if path_requested in paths_allowed:
+                    results.append(path_requested)
 
+        self._explicit_fields = results
         return results
 
+    def get_explicit_field_names(self):
+        """
+        Returns the names of the fields that were requested.
+        """
+        cached = getattr(self, "_explicit_field_names", None)
+        if cached is None:
+            explicit_fields = set(self.explicit_fields)
+            cached = self._explicit_field_names = set(
+                field_name
+                for field_name in self.fields
+                if self.get_explicit_field_path(field_name) in explicit_fields
+            )
+        return cached
+
+    def get_representation_fields(self):
+        field_names = self.get_explicit_field_names()
+        fields = super().get_representation_fields()
+        return [x for x in fields if x.field_name in field_names]
+
     def filter_explicit_fields(self, representation):
+        field_names = self.get_explicit_field_names()
         filtered = OrderedDict()
         for field_name, field_value in representation.items():
-            field_path = self.get_explicit_field_path(field_name)
-            if field_path in self.explicit_fields:
+            if field_name in field_names:
                 filtered[field_name] = field_value
         return filtered
 
-    def to_representation(self, obj):
-        representation = super().to_representation(obj)
-        filtered = self.filter_explicit_fields(representation)
-        return filtered
+
+class ExplicitFieldsViewMixin:
+    """
+    Used in conjunction with the ExplicitFieldsMixin to only load the columns of the
+    requested fields for safe requests.
+
+    If a requested field does not read a model field directly (eg: a method field),
+    the queryset is left unchanged, since the columns it reads are unknown.
+    """
+
+    def get_explicit_field_columns(self, serializer):
+        """
+        Returns the model fields to load for the requested serializer fields, or None
+        if they cannot be determined.
+        """
+        model = serializer.Meta.model
+        columns = set()
+        for field_name in serializer.get_explicit_field_names():
+            field = serializer.fields[field_name]
+            if field.source == "*":
+                # Identity fields only read the attributes used in their urls. Any
+                # other field given the whole object (eg: a method field) can read
+                # anything.
+                lookup_fields = getattr(field, "lookup_fields", None)
+                if lookup_fields is None:
+                    if not hasattr(field, "lookup_field"):
+                        return None
+                    lookup_fields = [(field.lookup_field, None)]
+                names = [x[0].split(".")[0] for x in lookup_fields]
+            else:
+                names = field.source_attrs[:1]
+            for name in names:
+                if name == "pk":
+                    name = model._meta.pk.name
+                try:
+                    model_field = model._meta.get_field(name)
+                except FieldDoesNotExist:
+                    return None
+                if model_field.concrete:
+                    columns.add(model_field.name)
+                elif not model_field.is_relation:
+                    return None
+        return columns
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+        serializer = self.get_serializer()
+        if not isinstance(serializer, ExplicitFieldsMixin):
+            return queryset
+        columns = self.get_explicit_field_columns(serializer)
+        if columns is None:
+            return queryset
+        columns.add(queryset.model._meta.pk.name)
+        return queryset.only(*columns)
+
+
+class ExpandableFieldsMixin(RepresentationMixin):
+    """
+    Replaces related fields with nested representations when they are named in the
+    expand query param, eg: ?expand=author,author.profile
+
+    expandable_fields maps a field name to the serializer class used to expand it.
+    Expanding only changes the output, so writes still use the original fields.
+    """
+
+    expandable_fields = {}
+    expand_query_param = "expand"
+
+    def __init__(self, *args, **kwargs):
+        self.expand_prefix = kwargs.pop("expand_prefix", "")
+        super().__init__(*args, **kwargs)
+
+    def get_expand_paths_requested(self):
+        request = self.context.get("request", None)
+        if request is None:
+            return []
+        query_params = getattr(request, "query_params", request.GET)
+        value = query_params.get(self.expand_query_param, "")
+        return [x.strip() for x in value.split(",") if len(x.strip())]
+
+    def get_expanded_paths(self):
+        """
+        Returns the requested paths, relative to this serializer.
+        """
+        cached = getattr(self, "_expanded_paths", None)
+        if cached is None:
+            cached = self._expanded_paths = []
+            prefix = self.expand_prefix
+            for path in self.get_expand_paths_requested():
+                if len(prefix):
+                    if not path.startswith("{}.".format(prefix)):
+                        continue
+                    path = path[len(prefix) + 1 :]
+                if path not in cached:
+                    cached.append(path)
+        return cached
+
+    def get_expanded_field_names(self):
+        names = set()
+        for path in self.get_expanded_paths():
+            name = path.split(".")[0]
+            if name in self.expandable_fields:
+                names.add(name)
+        return names
+
+    def get_expanded_field(self, field):
+        serializer_class = self.expandable_fields[field.field_name]
+        kwargs = {
+            "many": isinstance(field, (ManyRelatedField, ListSerializer)),
+            "read_only": True,
+        }
+        if field.source != field.field_name:
+            kwargs["source"] = field.source
+        if issubclass(serializer_class, ExpandableFieldsMixin):
+            prefix = self.expand_prefix
+            path = field.field_name
+            if len(prefix):
+                path = "{}.{}".format(prefix, path)
+            kwargs["expand_prefix"] = path
+        expanded = serializer_class(**kwargs)
+        expanded.bind(field.field_name, self)
+        return expanded
+
+    def get_representation_fields(self):
+        names = self.get_expanded_field_names()
+        fields = super().get_representation_fields()
+        if not len(names):
+            return fields
+        return [
+            self.get_expanded_field(x) if x.field_name in names else x for x in fields
+        ]
+
+    def get_expanded_relations(self):
+        """
+        Returns the select_related and prefetch_related lookups that load the expanded
+        fields.
+        """
+        select_related = []
+        prefetch_related = []
+        # Fields left out of the representation (eg: by ?fields=) aren't loaded.
+        represented = set(x.field_name for x in self.get_representation_fields())
+        for path in self.get_expanded_paths():
+            if path.split(".")[0] not in represented:
+                continue
+            serializer = self
+            model = self.Meta.model
+            lookups = []
+            many = False
+            for name in path.split("."):
+                expandable_fields = getattr(serializer, "expandable_fields", {})
+                field = serializer.fields.get(name, None)
+                if field is None or name not in expandable_fields:
+                    break
+                try:
+                    relation = model._meta.get_field(field.source)
+                except FieldDoesNotExist:
+                    break
+                if not relation.is_relation:
+                    break
+                lookups.append(field.source)
+                if relation.many_to_many or relation.one_to_many:
+                    many = True
+                model = relation.related_model
+                serializer = expandable_fields[name]()
+            if len(lookups):
+                lookup = "__".join(lookups)
+                if many is True:
+                    prefetch_related.append(lookup)
+                else:
+                    select_related.append(lookup)
+        return (select_related, prefetch_related)
+
+
+class ExpandableFieldsViewMixin:
+    """
+    Used in conjunction with the ExpandableFieldsMixin to load the expanded relations
+    with select_related and prefetch_related.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer = self.get_serializer()
+        if not isinstance(serializer, ExpandableFieldsMixin):
+            return queryset
+        select_related, prefetch_related = serializer.get_expanded_relations()
+        if len(select_related):
+            queryset = queryset.select_related(*select_related)
+        if len(prefetch_related):
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+
+class EagerLoadingViewMixin:
+    """
+    Walks the serializer's field tree and applies the select_related and
+    prefetch_related lookups its nested serializers, dotted sources and dotted
+    lookup_fields need, so list endpoints run a fixed number of queries.
+
+    The lookups are computed once per serializer class and field tree, and kept in a
+    bounded cache since the tree depends on the query params.
+    """
+
+    eager_loading_max_depth = 5
+    eager_loading_plans = LRUCache(256)
+
+    def get_representation_fields(self, serializer):
+        if isinstance(serializer, RepresentationMixin):
+            return serializer.get_representation_fields()
+        return list(serializer._readable_fields)
+
+    def get_relation_lookups(self, model, bits):
+        """
+        Returns the leading relations of the path, the model they end on, and whether
+        any of them is to-many.
+        """
+        lookups = []
+        many = False
+        for bit in bits:
+            try:
+                field = model._meta.get_field(bit)
+            except FieldDoesNotExist:
+                break
+            if not field.is_relation or field.related_model is None:
+                break
+            lookups.append(bit)
+            if field.many_to_many or field.one_to_many:
+                many = True
+            model = field.related_model
+        return (lookups, model, many)
+
+    def get_lookup_field_paths(self, field):
+        lookup_fields = getattr(field, "lookup_fields", None)
+        if lookup_fields is not None:
+            return [x[0].split(".") for x in lookup_fields]
+        lookup_field = getattr(field, "lookup_field", None)
+        if lookup_field is not None:
+            return [lookup_field.split(".")]
+        return []
+
+    def add_eager_lookups(self, plan, model, bits, prefix, many):
+        lookups, model, is_many = self.get_relation_lookups(model, bits)
+        many = many or is_many
+        if len(lookups):
+            lookup = "__".join(prefix + lookups)
+            plan[1 if many else 0].add(lookup)
+        return (lookups, model, many)
+
+    def collect_eager_lookups(self, plan, fields, model, prefix, many, depth):
+        if depth > self.eager_loading_max_depth:
+            return
+        for field in fields:
+            bits = field.source_attrs
+            if isinstance(field, BaseSerializer):
+                nested = field.child if isinstance(field, ListSerializer) else field
+                lookups, nested_model, nested_many = self.add_eager_lookups(
+                    plan, model, bits, prefix, many
+                )
+                if len(lookups) == len(bits):
+                    self.collect_eager_lookups(
+                        plan,
+                        self.get_representation_fields(nested),
+                        nested_model,
+                        prefix + lookups,
+                        nested_many,
+                        depth + 1,
+                    )
+            elif isinstance(field, (RelatedField, ManyRelatedField)):
+                child = getattr(field, "child_relation", field)
+                relation = self.get_relation_lookups(model, bits)
+                pk_only = child.use_pk_only_optimization() and not relation[2]
+                paths = [x for x in self.get_lookup_field_paths(child) if len(x) > 1]
+                if pk_only and not len(paths):
+                    continue
+                lookups, related_model, related_many = self.add_eager_lookups(
+                    plan, model, bits, prefix, many
+                )
+                if len(lookups) == len(bits):
+                    for path in paths:
+                        self.add_eager_lookups(
+                            plan,
+                            related_model,
+                            path[:-1],
+                            prefix + lookups,
+                            related_many,
+                        )
+            elif field.source == "*":
+                for path in self.get_lookup_field_paths(field):
+                    self.add_eager_lookups(plan, model, path[:-1], prefix, many)
+            elif len(bits) > 1:
+                self.add_eager_lookups(plan, model, bits[:-1], prefix, many)
+
+    def get_eager_loading_shape(self, fields, depth=0):
+        """
+        Returns a hashable description of the field tree, including the fields of
+        nested serializers, which is used to key the plans.
+        """
+        shape = []
+        for field in fields:
+            nested = None
+            is_serializer = isinstance(field, BaseSerializer)
+            if is_serializer and depth < self.eager_loading_max_depth:
+                child = field.child if isinstance(field, ListSerializer) else field
+                nested = self.get_eager_loading_shape(
+                    self.get_representation_fields(child), depth + 1
+                )
+            shape.append((field.field_name, field.__class__, field.source, nested))
+        return tuple(shape)
+
+    def get_eager_loading_plan(self, serializer):
+        """
+        Returns the select_related and prefetch_related lookups for the serializer.
+        """
+        fields = self.get_representation_fields(serializer)
+        key = (serializer.__class__, self.get_eager_loading_shape(fields))
+        plan = self.eager_loading_plans.get(key)
+        if plan is None:
+            plan = (set(), set())
+            model = serializer.Meta.model
+            self.collect_eager_lookups(plan, fields, model, [], False, 0)
+            plan = (tuple(sorted(plan[0])), tuple(sorted(plan[1])))
+            self.eager_loading_plans.set(key, plan)
+        return plan
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer = self.get_serializer()
+        if getattr(getattr(serializer, "Meta", None), "model", None) is None:
+            return queryset
+        select_related, prefetch_related = self.get_eager_loading_plan(serializer)
+        if len(select_related):
+            queryset = queryset.select_related(*select_related)
+        if len(prefetch_related):
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
 
 
 class DebugOnlyResponseMixin:
@@ -199,13 +709,10 @@ class EndpointsAllowedMixin:
 
     endpoints_allowed = []
 
-    def get_endpoints(self, request, format):
-        endpoints = super().get_endpoints(request, format)
+    def filter_endpoints(self, endpoints):
+        endpoints = super().filter_endpoints(endpoints)
         allowed = self.endpoints_allowed
-        for name, _ in endpoints.items():
-            if name not in allowed:
-                del endpoints[name]
-        return endpoints
+        return OrderedDict((k, v) for k, v in endpoints.items() if k in allowed)
 
 
 class EndpointsRemovedMixin:
@@ -215,13 +722,10 @@ class EndpointsRemovedMixin:
 
     endpoints_removed = []
 
-    def get_endpoints(self, request, format):
-        endpoints = super().get_endpoints(request, format)
+    def filter_endpoints(self, endpoints):
+        endpoints = super().filter_endpoints(endpoints)
         removed = self.endpoints_removed
-        for name, _ in endpoints.items():
-            if name in removed:
-                del endpoints[name]
-        return endpoints
+        return OrderedDict((k, v) for k, v in endpoints.items() if k not in removed)
 
 
 class SkippedFieldsMixin:
@@ -246,27 +750,127 @@ class GetOrCreateMixin:
     """
     Allows a get or create of an object.
     https://stackoverflow.com/questions/25026034/django-rest-framework-modelserializer-get-or-create-functionality
+
+    Use the GetOrCreateListSerializer as the Meta.list_serializer_class to get or
+    create many objects in bulk.
+
+    Set natural_key_fields to fields that match a unique constraint to upsert instead.
+    The object is then written with a single INSERT ... ON CONFLICT, which updates
+    the existing row, or leaves it alone when natural_key_conflicts is "ignore".
     """
 
+    natural_key_fields = None
+    natural_key_conflicts = "update"
+
+    def get_natural_key_fields(self):
+        """
+        Returns the natural key fields, after checking they match a unique constraint.
+        """
+        if self.natural_key_fields is None:
+            return None
+        model = self.Meta.model
+        pk_name = model._meta.pk.name
+        fields = tuple(pk_name if x == "pk" else x for x in self.natural_key_fields)
+        if not has_unique_constraint(model, fields):
+            message = "The natural_key_fields {} are not unique together on {}."
+            raise ImproperlyConfigured(message.format(fields, model.__name__))
+        return fields
+
+    def get_upsert_update_fields(self, attrs):
+        """
+        Returns the fields to update when the natural key already exists.
+        """
+        if self.natural_key_conflicts == "ignore":
+            return []
+        natural_key_fields = self.get_natural_key_fields()
+        return [
+            x.name
+            for x in self.Meta.model._meta.concrete_fields
+            if not x.primary_key
+            and x.name in attrs
+            and x.name not in natural_key_fields
+        ]
+
+    def get_lookup_kwargs(self, data):
+        """
+        Returns the kwargs used to find an existing object for the data.
+        """
+        natural_key_fields = self.get_natural_key_fields()
+        if natural_key_fields is None:
+            return data
+        if any([x not in data for x in natural_key_fields]):
+            return {}
+        return {x: data[x] for x in natural_key_fields}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # The upsert resolves conflicts, so the natural key must not be rejected.
+        for field_name in self.natural_key_fields or []:
+            field = fields.get(field_name, None)
+            if field is not None:
+                field.validators = [
+                    x for x in field.validators if not isinstance(x, UniqueValidator)
+                ]
+        return fields
+
+    def get_validators(self):
+        validators = super().get_validators()
+        if self.natural_key_fields is None:
+            return validators
+        natural_key_fields = set(self.natural_key_fields)
+        results = []
+        for validator in validators:
+            fields = getattr(validator, "fields", None)
+            if fields and set(fields) <= natural_key_fields:
+                continue
+            results.append(validator)
+        return results
+
+    def create(self, validated_data):
+        natural_key_fields = self.get_natural_key_fields()
+        if natural_key_fields is None:
+            return super().create(validated_data)
+
+        model = self.Meta.model
+        attrs = dict(validated_data)
+        many_to_many = {}
+        for field in model._meta.many_to_many:
+            if field.name in attrs:
+                many_to_many[field.name] = attrs.pop(field.name)
+
+        with transaction.atomic():
+            update_fields = self.get_upsert_update_fields(attrs)
+            objs = bulk_upsert(
+                model, [model(**attrs)], natural_key_fields, update_fields
+            )
+            instance = objs[0]
+            for field_name, value in many_to_many.items():
+                getattr(instance, field_name).set(value)
+        return instance
+
     def is_valid(self, raise_exception=False):
+        if self.natural_key_fields is not None:
+            # The upsert finds the existing object, so there is nothing to look up.
+            return super().is_valid(raise_exception=raise_exception)
         if hasattr(self, "initial_data"):
             # if we are instantiating with data={something}.
+            lookup_kwargs = self.get_lookup_kwargs(self.initial_data)
             try:
                 # try to get the object in question.
-                obj = self.Meta.model.objects.get(**self.initial_data)
+                obj = self.Meta.model.objects.get(**lookup_kwargs)
             except (ObjectDoesNotExist, MultipleObjectsReturned):
                 # except not find the object or the data being ambigious
                 # for defining it. Then validate the data as usual.
-                return super().is_valid(raise_exception)
+                return super().is_valid(raise_exception=raise_exception)
             else:
                 # If the object is found, add it to the serializer.
                 # Then, validate the data as usual.
                 self.instance = obj
-                return super().is_valid(raise_exception)
+                return super().is_valid(raise_exception=raise_exception)
         else:
             # If the serializer was instantiated with just an object,
             # and no data={something} proceed as usual.
-            return super().is_valid(raise_exception)
+            return super().is_valid(raise_exception=raise_exception)
 
 
 class OrderByFieldNameMixin:
@@ -300,12 +904,38 @@ class CheckQuerysetObjectPermissionsMixin:
     """
     Check object permissions for each object in queryset.
     NOTE: Requires that the permission classes include an object permission check.
+
+    Permissions that define filter_queryset(request, view, queryset) return a Q object
+    that is applied to the queryset in SQL instead, so objects that fail are excluded.
+    Only permissions that return None from it, or do not define it, are checked per
+    object.
     """
 
     def get_queryset(self):
         queryset = super().get_queryset()
-        for obj in queryset:
-            self.check_object_permissions(self.request, obj)
+        remaining = []
+        for permission in self.get_permissions():
+            has_object_permission = type(permission).has_object_permission
+            if has_object_permission is BasePermission.has_object_permission:
+                continue
+            condition = None
+            filter_queryset = getattr(permission, "filter_queryset", None)
+            if filter_queryset is not None:
+                condition = filter_queryset(self.request, self, queryset)
+            if condition is None:
+                remaining.append(permission)
+            else:
+                queryset = queryset.filter(condition)
+
+        if len(remaining):
+            for obj in queryset:
+                for permission in remaining:
+                    if not permission.has_object_permission(self.request, self, obj):
+                        self.permission_denied(
+                            self.request,
+                            message=getattr(permission, "message", None),
+                            code=getattr(permission, "code", None),
+                        )
         return queryset
 
 
@@ -327,51 +957,154 @@ class ValidateCurrentUserMixin:
             raise AttributeError("There is not user in the request")
         return user
 
+    current_user_error_message = (
+        "The user specified does not match the current session."
+    )
+
     def validate_with_current_user(self, value):
         if self.current_user != value:
-            raise ValidationError(
-                "The user specified does not match the current session."
-            )
+            raise ValidationError(self.current_user_error_message)
+
+
+class NestedUserFieldsListSerializer(ListSerializer):
+    """
+    Validates the nested user fields of every child together, with one query for each
+    field instead of one for each child.
+    """
+
+    def to_internal_value(self, data):
+        validated = super().to_internal_value(data)
+        errors = self.child.get_nested_user_errors(validated)
+        if any(errors):
+            if getattr(api_settings, "LIST_SERIALIZER_ERRORS_AS_DICT", False):
+                errors = {i: x for i, x in enumerate(errors) if len(x)}
+            raise ValidationError(errors)
+        return validated
 
 
 class NestedUserFieldsValidatorsMixin(ValidateCurrentUserMixin):
     """
     Creates a validator for specified fields. Validates the fields value against the
     current user.
+
+    With many=True, a plain ListSerializer becomes a NestedUserFieldsListSerializer,
+    which checks the fields of every item at once.
     """
 
     nested_user_fields = {}
 
-    def create_validator_for_nested_user_field(self, bits):
-        def validator(value):
-            attr = value
-            last = value
-            for bit in bits:
-                last = attr
-                attr = getattr(attr, bit, None)
-                if attr is None:
-                    raise AttributeError(
-                        "The attribute '{}' does not exist on object {}.".format(
-                            bit, last
-                        )
-                    )
-            self.validate_with_current_user(attr)
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        serializer = super().many_init(*args, **kwargs)
+        if type(serializer) is ListSerializer:
+            serializer.__class__ = NestedUserFieldsListSerializer
+        return serializer
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for field_name, path in cls.nested_user_fields.items():
+            validator_name = "validate_{}".format(field_name)
+            validator = getattr(cls, validator_name, None)
+            if validator is None or hasattr(validator, "nested_user_path"):
+                validator = cls.create_validator_for_nested_user_field(path.split("."))
+                setattr(cls, validator_name, validator)
+
+    @classmethod
+    def create_validator_for_nested_user_field(cls, bits):
+        def validator(self, value):
+            # The list serializer checks every item at once.
+            if value is None or isinstance(self.parent, NestedUserFieldsListSerializer):
+                return value
+            if isinstance(value, (list, tuple, QuerySet)):
+                self.validate_nested_user_objects(value, bits)
+            elif isinstance(value, Model):
+                self.validate_nested_user_objects([value], bits)
+            else:
+                self.validate_with_current_user(self.get_nested_user(value, bits))
             return value
 
+        validator.nested_user_path = bits
         return validator
 
-    def set_validators_for_nested_user_fields(self):
+    def get_nested_user(self, value, bits):
+        attr = value
+        last = value
+        for bit in bits:
+            last = attr
+            attr = getattr(attr, bit, None)
+            if attr is None:
+                raise AttributeError(
+                    "The attribute '{}' does not exist on object {}.".format(bit, last)
+                )
+        return attr
+
+    def get_invalid_nested_user_pks(self, objs, bits):
+        """
+        Returns the pks of the objects that don't belong to the current user, using a
+        single query, or none when the user is a foreign key on the objects themselves.
+        """
+        user = self.current_user
+        pks = set(obj.pk for obj in objs)
+        if not getattr(user, "is_authenticated", False):
+            return pks
+        if not len(objs):
+            return set()
+        model = objs[0].__class__
+        if len(bits) == 1:
+            try:
+                field = model._meta.get_field(bits[0])
+            except FieldDoesNotExist:
+                field = None
+            if field is not None and field.many_to_one and field.concrete:
+                user_value = getattr(user, field.target_field.attname)
+                return set(
+                    obj.pk for obj in objs if getattr(obj, field.attname) != user_value
+                )
+        queryset = model._default_manager.filter(pk__in=pks, **{"__".join(bits): user})
+        return pks - set(queryset.values_list("pk", flat=True))
+
+    def validate_nested_user_objects(self, objs, bits):
+        if not getattr(self.current_user, "is_authenticated", False):
+            raise ValidationError(self.current_user_error_message)
+        if len(self.get_invalid_nested_user_pks(objs, bits)):
+            raise ValidationError(self.current_user_error_message)
+
+    def get_nested_user_errors(self, items):
+        """
+        Returns the errors for each validated item, checking the objects of each nested
+        user field across all the items together.
+        """
+        errors = [{} for _ in items]
         for field_name, path in self.nested_user_fields.items():
-            validator_name = "validate_{}".format(field_name)
+            field = self.fields.get(field_name, None)
+            if field is None or field.read_only:
+                continue
             bits = path.split(".")
-            validator = getattr(self, validator_name, None)
-            if validator is None:
-                validator = self.create_validator_for_nested_user_field(bits)
-                setattr(self, validator_name, validator)
-
-    def __init__(self, *args, **kwargs):
-        self.set_validators_for_nested_user_fields()
-        super().__init__(*args, **kwargs)
+            found = []
+            for i, item in enumerate(items):
+                value = item
+                for attr in field.source_attrs:
+                    value = (
+                        value.get(attr, None) if isinstance(value, Mapping) else None
+                    )
+                if isinstance(value, (list, tuple, QuerySet)):
+                    found += [(i, x) for x in value]
+                elif isinstance(value, Model):
+                    found.append((i, value))
+                elif value is not None:
+                    try:
+                        self.validate_with_current_user(
+                            self.get_nested_user(value, bits)
+                        )
+                    except ValidationError as e:
+                        errors[i][field_name] = e.detail
+            if not len(found):
+                continue
+            invalid = self.get_invalid_nested_user_pks([x for _, x in found], bits)
+            for i, obj in found:
+                if obj.pk in invalid:
+                    errors[i][field_name] = [self.current_user_error_message]
+        return errors
 
 
 class ValidateUserFieldMixin(ValidateCurrentUserMixin):
@@ -396,25 +1129,222 @@ class SerializerClassByActionMixin:
         return attr.get(self.action, super().get_serializer_class())
 
 
+class QuerysetByActionMixin:
+    """
+    Shapes the queryset based on the action verb, so each action only fetches what its
+    serializer reads.
+
+    queryset_by_action maps an action (or "all" and "default") to a dict with any of
+    the keys "annotate", "select_related", "prefetch_related", "only" and "defer".
+    List it after OrderByFieldNameMixin and ExcludeKwargsMixin, so that they can use
+    its annotations.
+    """
+
+    queryset_by_action = {}
+    queryset_shapings = {}
+
+    def merge_queryset_shapings(self, *shapings):
+        merged = {"annotate": OrderedDict()}
+        for shaping in shapings:
+            for key, value in shaping.items():
+                if key == "annotate":
+                    merged[key].update(value)
+                else:
+                    names = merged.get(key, []) + list(value)
+                    merged[key] = list(OrderedDict.fromkeys(names))
+        return merged
+
+    def freeze_queryset_shaping(self, shaping):
+        return tuple(
+            (key, tuple(value.items()) if isinstance(value, dict) else tuple(value))
+            for key, value in shaping.items()
+        )
+
+    def get_queryset_shaping(self, action):
+        """
+        Returns the merged shaping for the action, which is resolved once for each view
+        class and queryset_by_action mapping.
+        """
+        attr = self.queryset_by_action
+        for_all = attr.get("all", {})
+        for_action = attr.get(action, attr.get("default", {}))
+        # The mapping can be passed to as_view(), so it's part of the key.
+        key = (
+            self.__class__,
+            action,
+            self.freeze_queryset_shaping(for_all),
+            self.freeze_queryset_shaping(for_action),
+        )
+        try:
+            return self.queryset_shapings[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Values that can't be hashed are merged on every request.
+            key = None
+        shaping = self.merge_queryset_shapings(for_all, for_action)
+
+        # Fields followed with select_related can't also be deferred by only().
+        if shaping.get("only"):
+            names = list(shaping["only"])
+            for path in shaping.get("select_related", []):
+                names.append(path.split("__")[0])
+            shaping["only"] = list(OrderedDict.fromkeys(names))
+
+        if key is not None:
+            self.queryset_shapings[key] = shaping
+        return shaping
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        shaping = self.get_queryset_shaping(getattr(self, "action", None))
+        if shaping["annotate"]:
+            queryset = queryset.annotate(**shaping["annotate"])
+        if shaping.get("select_related"):
+            queryset = queryset.select_related(*shaping["select_related"])
+        if shaping.get("prefetch_related"):
+            queryset = queryset.prefetch_related(*shaping["prefetch_related"])
+        if shaping.get("only"):
+            queryset = queryset.only(*shaping["only"])
+        if shaping.get("defer"):
+            queryset = queryset.defer(*shaping["defer"])
+        return queryset
+
+
 class PermissionClassesByActionMixin:
     """
     Returns a list of permission classes to use based on the action verb.
     https://stackoverflow.com/questions/36001485/django-rest-framework-different-permission-per-methods-within-same-view
+
+    Permissions are ordered by their cost attribute, so the cheapest checks run first.
+    Permissions without a cost use default_permission_cost.
     """
 
     permission_classes_by_action = {}
+    default_permission_cost = 1
+    permission_chains = {}
 
-    def get_permissions(self):
+    def get_permission_cost(self, permission):
+        return getattr(permission, "cost", self.default_permission_cost)
+
+    def get_permission_chain(self, action):
+        """
+        Returns the ordered permission classes for the action, which are resolved once
+        for each view class and permission_classes_by_action mapping.
+        """
         attr = self.permission_classes_by_action
-        for_all = attr.get("all", [])
-        for_action = attr.get(self.action, attr.get("default", []))
-        permission_classes = list(set(for_all + for_action))
+        for_all = list(attr.get("all", []))
+        for_action = list(attr.get(action, attr.get("default", [])))
+        # The mapping can be passed to as_view(), so it's part of the key.
+        key = (self.__class__, action, tuple(for_all), tuple(for_action))
+        try:
+            return self.permission_chains[key]
+        except KeyError:
+            pass
+        permission_classes = list(OrderedDict.fromkeys(for_all + for_action))
+        permission_classes.sort(key=self.get_permission_cost)
+        chain = self.permission_chains[key] = tuple(permission_classes)
+        return chain
+
+    def get_permissions(self):
+        permission_classes = self.get_permission_chain(self.action)
         if permission_classes:
             return [p() for p in permission_classes]
-        return super().get_permissions()
+        permissions = super().get_permissions()
+        return sorted(permissions, key=self.get_permission_cost)
+
+
+class ObjectCacheMixin:
+    """
+    Caches the objects fetched by get_object through Django's cache framework, when
+    object_cache_timeout is set. Each cached object is stored with a generation counter
+    for its pk, which is incremented when the object is saved or deleted, so entries
+    from an older generation are refetched.
+
+    The key includes the lookup kwargs and the SQL of the filtered queryset, so
+    querysets that differ per user never share an object.
+    """
+
+    object_cache_timeout = None
+    object_cache_alias = "default"
+    object_cache_prefix = "rest_framework_helpers.object"
+    object_cache_models = {}
+
+    @classmethod
+    def invalidate_cached_object(cls, sender, instance, **kwargs):
+        for alias, prefix in cls.object_cache_models.get(sender, set()):
+            cache = caches[alias]
+            key = cls.get_object_cache_generation_key(prefix, sender, instance.pk)
+            try:
+                cache.incr(key)
+            except ValueError:
+                # The counter expired, so start a new one that no entry can match.
+                cache.add(key, time.time_ns(), None)
+
+    @classmethod
+    def get_object_cache_generation_key(cls, prefix, model, pk):
+        return "{}:{}:pk:{}".format(prefix, model._meta.label_lower, pk)
+
+    def get_object_cache_generation(self, cache, model, pk):
+        key = self.get_object_cache_generation_key(self.object_cache_prefix, model, pk)
+        generation = cache.get(key, None)
+        if generation is None:
+            cache.add(key, time.time_ns(), None)
+            generation = cache.get(key, None)
+        return generation
+
+    def get_object_cache_key(self, queryset, object_kwargs):
+        try:
+            sql = str(queryset.filter(**object_kwargs).query)
+        except Exception:
+            return None
+        lookup = repr(sorted(object_kwargs.items()))
+        digest = md5("{}{}".format(lookup, sql).encode("utf-8")).hexdigest()
+        label = queryset.model._meta.label_lower
+        return "{}:{}:{}".format(self.object_cache_prefix, label, digest)
+
+    def register_cached_object(self, cache, key, obj):
+        model = obj.__class__
+        registered = self.object_cache_models.setdefault(model, set())
+        if not len(registered):
+            uid = "object_cache_{}".format(model._meta.label_lower)
+            post_save.connect(
+                self.invalidate_cached_object, sender=model, dispatch_uid=uid
+            )
+            post_delete.connect(
+                self.invalidate_cached_object, sender=model, dispatch_uid=uid
+            )
+        registered.add((self.object_cache_alias, self.object_cache_prefix))
 
+        generation = self.get_object_cache_generation(cache, model, obj.pk)
+        if generation is not None:
+            entry = (obj.pk, generation, obj)
+            cache.set(key, entry, self.object_cache_timeout)
 
-class MultipleFieldLookupMixin:
+    def get_cached_object(self, queryset, object_kwargs):
+        """
+        Returns the object for the kwargs from the cache, or fetches and caches it.
+        """
+        if self.object_cache_timeout is None:
+            return get_object_or_404(queryset, **object_kwargs)
+        key = self.get_object_cache_key(queryset, object_kwargs)
+        if key is None:
+            return get_object_or_404(queryset, **object_kwargs)
+        cache = caches[self.object_cache_alias]
+        entry = cache.get(key, None)
+        if entry is not None:
+            pk, generation, obj = entry
+            generation_key = self.get_object_cache_generation_key(
+                self.object_cache_prefix, queryset.model, pk
+            )
+            if cache.get(generation_key, None) == generation:
+                return obj
+        obj = get_object_or_404(queryset, **object_kwargs)
+        self.register_cached_object(cache, key, obj)
+        return obj
+
+
+class MultipleFieldLookupMixin(ObjectCacheMixin):
     """
     Apply this mixin to any view or viewset to get multiple field filtering based on a
     `lookup_fields` attribute, instead of the default single field filtering.
@@ -427,29 +1357,141 @@ class MultipleFieldLookupMixin:
         for field in self.lookup_fields:
             if self.kwargs[field]:  # Ignore empty fields.
                 filter[field] = self.kwargs[field]
-        return get_object_or_404(queryset, **filter)  # Lookup the object
+        return self.get_cached_object(queryset, filter)  # Lookup the object
 
 
 class HyperlinkListMixin:
     """
     List URL attribute from each object.
+
+    When the serializer's url field is a plain hyperlinked identity field, only its
+    lookup columns are fetched and the urls are built from a compiled url template,
+    without serializing the objects.
     """
 
+    url_field_name = None
+
+    def get_url_field(self):
+        serializer = self.get_serializer()
+        field_name = self.url_field_name or api_settings.URL_FIELD_NAME
+        return serializer.fields.get(field_name, None)
+
+    def get_url_lookup_fields(self, field):
+        """
+        Returns the (model_field, url_param) pairs used to build the field's urls, or
+        None when they can't be read from the database columns.
+        """
+        if not isinstance(field, HyperlinkedIdentityField):
+            return None
+        if isinstance(field, CompiledURLMixin):
+            # Overrides can build urls that the template doesn't know about.
+            field_class = type(field)
+            for name in ("get_url", "get_url_kwargs", "build_url"):
+                if getattr(field_class, name) is not getattr(CompiledURLMixin, name):
+                    return None
+            return [tuple(x) for x in field.lookup_fields]
+        if type(field).get_url is not HyperlinkedIdentityField.get_url:
+            return None
+        return [(field.lookup_field, field.lookup_url_kwarg)]
+
+    def get_url_column(self, model, model_field):
+        """
+        Returns the values() column for a dotted model field path, or None when the
+        path doesn't end in a concrete, non-relation field.
+        """
+        parts = model_field.split(".")
+        for i, part in enumerate(parts):
+            try:
+                field = model._meta.pk if part == "pk" else model._meta.get_field(part)
+            except FieldDoesNotExist:
+                return None
+            if i == len(parts) - 1:
+                if field.is_relation or not field.concrete:
+                    return None
+            elif not field.is_relation or field.many_to_many or field.one_to_many:
+                return None
+            else:
+                model = field.related_model
+        return "__".join(parts)
+
+    def get_url_columns(self, queryset):
+        """
+        Returns the url field and a mapping of url_param to column, or (None, None)
+        when the urls need the serializer.
+        """
+        field = self.get_url_field()
+        lookup_fields = self.get_url_lookup_fields(field)
+        if lookup_fields is None:
+            return None, None
+        if getattr(self.request, "versioning_scheme", None) is not None:
+            return None, None
+        columns = OrderedDict()
+        for model_field, url_param in lookup_fields:
+            column = self.get_url_column(queryset.model, model_field)
+            if column is None:
+                return None, None
+            columns[url_param] = column
+        return field, columns
+
+    def get_url_ordering_columns(self, queryset):
+        # Cursor based paginators read the ordering values from each row.
+        ordering = getattr(self.paginator, "ordering", None) or []
+        if hasattr(self.paginator, "get_ordering"):
+            ordering = self.paginator.get_ordering(self.request, queryset, self)
+        if isinstance(ordering, str):
+            ordering = [ordering]
+        columns = []
+        for name in list(queryset.query.order_by) + list(ordering):
+            if isinstance(name, str) and name != "?":
+                columns.append(name.lstrip("-"))
+        return columns
+
+    def build_urls(self, field, columns, rows):
+        request = self.request
+        if getattr(field, "relative_urls", False) is True:
+            request = None
+        format = field.context.get("format", None)
+        if format and field.format and field.format != format:
+            format = field.format
+        compiled = get_compiled_url(field.view_name, tuple(columns.keys()), format)
+
+        urls = []
+        for row in rows:
+            url_kwargs = {k: row[column] for k, column in columns.items()}
+            url = build_compiled_url(compiled, url_kwargs, format, request)
+            if url is None:
+                url = field.reverse(
+                    field.view_name, kwargs=url_kwargs, request=request, format=format
+                )
+            urls.append(url)
+        return urls
+
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
 
+        field, columns = self.get_url_columns(queryset)
+        if field is not None:
+            names = list(columns.values()) + self.get_url_ordering_columns(queryset)
+            queryset = queryset.values(*OrderedDict.fromkeys(names))
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                result = self.build_urls(field, columns, page)
+                return self.get_paginated_response(result)
+            return Response(self.build_urls(field, columns, queryset))
+
+        field_name = self.url_field_name or api_settings.URL_FIELD_NAME
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
-            result = [obj["url"] for obj in serializer.data]
+            result = [obj[field_name] for obj in serializer.data]
             return self.get_paginated_response(result)
 
         serializer = self.get_serializer(queryset, many=True)
-        result = [obj["url"] for obj in serializer.data]
+        result = [obj[field_name] for obj in serializer.data]
         return Response(result)
 
 
-class ParameterisedViewMixin:
+class ParameterisedViewMixin(ObjectCacheMixin):
     """
     Used in conjunction with the ParameterisedFieldMixin to enable multiple custom
     lookup_fields for queries.
@@ -480,12 +1522,88 @@ class ParameterisedViewMixin:
         queryset = self.get_queryset()
         queryset = self.filter_queryset(queryset)
         object_kwargs = self.get_object_kwargs()
-        obj = get_object_or_404(queryset, **object_kwargs)
+        obj = self.get_cached_object(queryset, object_kwargs)
         self.check_object_permissions(self.request, obj)
         return obj
 
 
-class ParameterisedFieldMixin:
+class CompiledURLMixin:
+    """
+    Builds hyperlinks from a url template that is compiled once for each view name and
+    set of lookup_fields, instead of reversing the url for every object.
+
+    Set relative_urls to True to return urls without the scheme and host.
+    """
+
+    relative_urls = False
+    url_getters = {}
+
+    def __init__(self, *args, **kwargs):
+        self.relative_urls = kwargs.pop("relative_urls", self.relative_urls)
+        super().__init__(*args, **kwargs)
+
+    def get_url_getters(self):
+        lookup_fields = tuple(tuple(x) for x in self.lookup_fields)
+        getters = self.url_getters.get(lookup_fields)
+        if getters is None:
+            getters = self.url_getters[lookup_fields] = [
+                (url_param, attrgetter(model_field))
+                for model_field, url_param in lookup_fields
+            ]
+        return getters
+
+    def get_url_kwargs(self, obj):
+        url_kwargs = {}
+        for url_param, getter in self.get_url_getters():
+            url_kwargs[url_param] = getter(obj)
+        return url_kwargs
+
+    def build_url(self, obj, view_name, request, format):
+        url_kwargs = self.get_url_kwargs(obj)
+        if self.relative_urls is True:
+            request = None
+
+        # Versioning schemes can change the view name or kwargs, so let them reverse.
+        # So does any value the url's converters or pattern wouldn't accept.
+        url = None
+        if getattr(request, "versioning_scheme", None) is None:
+            url_params = tuple(url_param for _, url_param in self.lookup_fields)
+            compiled = get_compiled_url(view_name, url_params, format)
+            url = build_compiled_url(compiled, url_kwargs, format, request)
+        if url is None:
+            url = self.reverse(
+                view_name, kwargs=url_kwargs, request=request, format=format
+            )
+        return url
+
+    def get_url(self, obj, view_name, request, format):
+        """
+        Given an object, return the URL that hyperlinks to the object.
+
+        May raise a `NoReverseMatch` if the `view_name` and `lookup_field`
+        attributes are not configured to correctly match the URL conf.
+        """
+        # # Unsaved objects will not yet have a valid URL.
+        if hasattr(obj, "pk") and obj.pk in (None, ""):
+            return None
+        return self.build_url(obj, view_name, request, format)
+
+
+class ParameterisedManyRelatedField(ManyRelatedField):
+    """
+    Resolves every submitted hyperlink with one query per lookup shape, instead of one
+    query per hyperlink.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+        return self.child_relation.get_objects(data)
+
+
+class ParameterisedFieldMixin(CompiledURLMixin):
     """
     Used in conjunction with the ParameterisedViewMixin to enable multiple custom
     lookup_fields for serializing.
@@ -497,6 +1615,17 @@ class ParameterisedFieldMixin:
         self.lookup_fields = kwargs.pop("lookup_fields", self.lookup_fields)
         super().__init__(*args, **kwargs)
 
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return ParameterisedManyRelatedField(**list_kwargs)
+
+    def filter_queryset(self, queryset):
+        return queryset
+
     def use_pk_only_optimization(self):
         """ Return true if all lookup fields for the models is its PK """
         result = False
@@ -520,84 +1649,239 @@ class ParameterisedFieldMixin:
         lookup_kwargs = self.get_object_kwargs(view_kwargs)
         return get_object_or_404(queryset, **lookup_kwargs)
 
-    def get_url_kwargs(self, obj):
-        url_kwargs = {}
-        for model_field, url_param in self.lookup_fields:
-            attr = obj
-            for field in model_field.split("."):
-                attr = getattr(attr, field)
-            url_kwargs[url_param] = attr
-        return url_kwargs
+    def get_view_kwargs(self, data):
+        """ Given a URL, return the kwargs of the view it resolves to. """
+        request = self.context.get("request")
+        try:
+            http_prefix = data.startswith(("http:", "https:"))
+        except AttributeError:
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+        if http_prefix:
+            data = urlparse(data).path
+            prefix = get_script_prefix()
+            if data.startswith(prefix):
+                data = "/" + data[len(prefix) :]
+
+        data = uri_to_iri(unquote(data))
+
+        try:
+            match = resolve(data)
+        except Resolver404:
+            self.fail("no_match")
+
+        try:
+            expected_viewname = request.versioning_scheme.get_versioned_viewname(
+                self.view_name, request
+            )
+        except AttributeError:
+            expected_viewname = self.view_name
 
-    def get_url(self, obj, view_name, request, format):
-        """
-        Given an object, return the URL that hyperlinks to the object.
+        if match.view_name != expected_viewname:
+            self.fail("incorrect_match")
 
-        May raise a `NoReverseMatch` if the `view_name` and `lookup_field`
-        attributes are not configured to correctly match the URL conf.
+        return match.kwargs
+
+    def get_objects_for_lookups(self, lookups):
         """
-        # # Unsaved objects will not yet have a valid URL.
-        if hasattr(obj, "pk") and obj.pk in (None, ""):
-            return None
-        url_kwargs = self.get_url_kwargs(obj)
-        return self.reverse(
-            view_name, kwargs=url_kwargs, request=request, format=format
-        )
+        Given a list of lookup kwargs, return the matching object (or None) for each,
+        using one query for every distinct set of lookup fields.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        return get_objects_for_lookups(queryset, lookups)
+
+    def get_objects(self, data):
+        """ Given a list of URLs, return the corresponding objects. """
+        errors = OrderedDict()
+        lookups = []
+        for index, item in enumerate(data):
+            try:
+                view_kwargs = self.get_view_kwargs(item)
+            except ValidationError as exc:
+                errors[index] = exc.detail
+                continue
+            lookups.append((index, self.get_object_kwargs(view_kwargs)))
+
+        objects = []
+        found = self.get_objects_for_lookups([lookup for _, lookup in lookups])
+        for (index, _), obj in zip(lookups, found):
+            if obj is None:
+                try:
+                    self.fail("does_not_exist")
+                except ValidationError as exc:
+                    errors[index] = exc.detail
+            else:
+                objects.append(obj)
+
+        if errors:
+            raise ValidationError(OrderedDict(sorted(errors.items())))
+        return objects
+
+
+class MeAliasResolverMixin:
+    """
+    Replaces "me" in string values with the alias from get_me_alias, when they are
+    read.
+    """
+
+    def resolve(self, value):
+        if not isinstance(value, str):
+            return value
+        if value != "me" and "/me/" not in value:
+            return value
+        get_me_alias = self.__dict__.get("get_me_alias", None)
+        alias = None if get_me_alias is None else get_me_alias()
+        if alias is None:
+            return value
+        if value == "me":
+            return alias
+        return value.replace("/me/", "/{}/".format(alias))
+
+
+class MeAliasDict(MeAliasResolverMixin, dict):
+    """
+    A dict that resolves "me" in its values when they are read, including through
+    dict(), ** and json.dumps(). The stored values are left alone.
+    """
+
+    def __init__(self, data, get_me_alias):
+        super().__init__(data)
+        self.get_me_alias = get_me_alias
+
+    def __getitem__(self, key):
+        return self.resolve(super().__getitem__(key))
+
+    def __iter__(self):
+        # Overriding this makes dict() and ** read the values through __getitem__.
+        return super().__iter__()
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, *args):
+        return self.resolve(super().pop(key, *args))
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def copy(self):
+        return {key: self[key] for key in self}
+
+
+class MeAliasQueryDict(MeAliasResolverMixin, QueryDict):
+    """
+    A QueryDict that resolves "me" in its values when they are read. Existing
+    QueryDicts are switched to it in place with wrap(), so nothing is copied.
+    """
+
+    @classmethod
+    def wrap(cls, query_dict, get_me_alias):
+        if not isinstance(query_dict, cls):
+            query_dict.__class__ = cls
+        query_dict.get_me_alias = get_me_alias
+        return query_dict
+
+    def __getitem__(self, key):
+        return self.resolve(super().__getitem__(key))
+
+    def getlist(self, key, default=None):
+        values = super().getlist(key, default)
+        if not isinstance(values, list):
+            return values
+        return [self.resolve(x) for x in values]
+
+    def lists(self):
+        for key, values in super().lists():
+            yield key, [self.resolve(x) for x in values]
+
+    def __copy__(self):
+        result = QueryDict("", mutable=True, encoding=self.encoding)
+        for key, values in self.lists():
+            result.setlist(key, values)
+        return result
+
+    def __deepcopy__(self, memo):
+        result = QueryDict("", mutable=True, encoding=self.encoding)
+        memo[id(self)] = result
+        for key, values in self.lists():
+            result.setlist(copy.deepcopy(key, memo), copy.deepcopy(values, memo))
+        return result
+
+
+class MeAliasRequest(Request):
+    """
+    Request whose data and query params resolve "me" lazily, from a user attribute
+    that is looked up once per request.
+    """
+
+    me_alias_lookup_field = "username"
+
+    @property
+    def data(self):
+        data = super().data
+        if isinstance(data, QueryDict):
+            return MeAliasQueryDict.wrap(data, self.get_me_alias)
+        if type(data) is dict:
+            data = self._full_data = MeAliasDict(data, self.get_me_alias)
+        return data
+
+    def get_me_alias(self):
+        if not hasattr(self, "_me_alias"):
+            self._me_alias = None
+            if self.user.is_authenticated:
+                alias = getattr(self.user, self.me_alias_lookup_field)
+                self._me_alias = str(alias)
+        return self._me_alias
 
 
 class MeAliasMixin:
-    def initial(self, request, *args, **kwargs):
-        """
-        This is the 'dispatch' method for rest_framework.  This has <request.data> etc.
+    """
+    Replaces "me" in the url kwargs, query params and request data with an attribute
+    of request.user.
 
-        This augments the request.data to change any values from "me" to
-        request.user.username.
+    Values are only resolved when they are read, and the request body is never
+    rewritten. The query params and form data stay the same QueryDict, switched to a
+    MeAliasQueryDict, and JSON data becomes a MeAliasDict, which is a dict.
+    """
 
-        (TODO: Check what the url_kwarg is to determine what part of request.user.<attr>
-        to use)
+    me_alias_lookup_field = "username"
 
-        NOTE: This affects multipart/form-data when we augment its contents and causes
-        the formData to be invalid/corrupt.
-        """
-        if request.user.is_authenticated:
-            for k, v in request.data.items():
-                if isinstance(v, str):
-                    if "/me/" in v:
-                        request.data[k] = v.replace(
-                            "/me/",
-                            "/{}/".format(
-                                getattr(request.user, self.me_alias_lookup_field)
-                            ),
-                        )
-                    elif "me" == v:
-                        request.data[k] = v.replace(
-                            "me", getattr(request.user, self.me_alias_lookup_field)
-                        )
-        return super().initial(request, *args, **kwargs)
+    def initialize_request(self, request, *args, **kwargs):
+        parser_context = self.get_parser_context(request)
+        request = MeAliasRequest(
+            request,
+            parsers=self.get_parsers(),
+            authenticators=self.get_authenticators(),
+            negotiator=self.get_content_negotiator(),
+            parser_context=parser_context,
+        )
+        request.me_alias_lookup_field = self.me_alias_lookup_field
+        MeAliasQueryDict.wrap(request._request.GET, request.get_me_alias)
+        return request
 
-    def dispatch(self, request, *args, **kwargs):
-        # Duplicate and replace the query params
+    def get_me_alias_kwargs(self, request, kwargs):
+        if "me" not in kwargs.values() or not request.user.is_authenticated:
+            return kwargs
         new_kwargs = dict(**kwargs)
-        new_query_params = request.GET.copy()
-        if request.user.is_authenticated:
-            for k, v in new_query_params.items():
-                if v == "me":
-                    new_query_params[k] = getattr(
-                        request.user, self.me_alias_lookup_field
-                    )
-            request.GET = new_query_params
-
-            # Duplicate and replace the kwargs
-            for k, v in new_kwargs.items():
-                if v == "me":
-                    k_bits = k.split("__")
-                    suffix = k_bits.pop()
-                    if suffix:
-                        new_kwargs[k] = getattr(request.user, suffix)
+        for k, v in kwargs.items():
+            if v == "me":
+                k_bits = k.split("__")
+                suffix = k_bits.pop()
+                if suffix:
+                    new_kwargs[k] = getattr(request.user, suffix)
+                else:
+                    if hasattr(request.user, k):
+                        new_kwargs[k] = getattr(request.user, k)
                     else:
-                        if hasattr(request.user, k):
-                            new_kwargs[k] = getattr(request.user, k)
-                        else:
-                            new_kwargs[k] = request.user
+                        new_kwargs[k] = request.user
+        return new_kwargs
 
+    def dispatch(self, request, *args, **kwargs):
+        new_kwargs = self.get_me_alias_kwargs(request, kwargs)
         return super().dispatch(request, *args, **new_kwargs)
@@ -1,10 +1,73 @@
-from rest_framework.pagination import PageNumberPagination
+import datetime
+import json
+from base64 import b64decode, b64encode
+from binascii import Error as BinasciiError
+from collections import OrderedDict
+from decimal import Decimal
+from functools import partial
+from hashlib import md5
+from uuid import UUID
+from django.core.cache import caches
+from django.core.exceptions import EmptyResultSet
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db.models import Q, QuerySet
+from django.utils.duration import duration_iso_string
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    PageNumberPagination,
+    _positive_int,
+)
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .utils import get_estimated_count
 
 
 class DataOnlyPagination(PageNumberPagination):
+    """
+    Returns only the data, and whether there is a next page in a header.
+
+    It fetches one row more than the page size to find out, instead of counting. So
+    the last page can't be found, and last_page_strings are rejected with a 404.
+    """
+
+    has_next_header = "X-Has-Next"
+    last_page_message = _("The last page is not available without a count.")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        page_number = request.query_params.get(self.page_query_param) or 1
+        if page_number in self.last_page_strings:
+            raise NotFound(self.last_page_message)
+        try:
+            page_number = _positive_int(page_number, strict=True)
+        except ValueError as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+
+        offset = (page_number - 1) * page_size
+        results = list(queryset[offset : offset + page_size + 1])
+        if page_number > 1 and not len(results):
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message="That page contains no results"
+            )
+            raise NotFound(msg)
+        self.has_next = len(results) > page_size
+        return results[:page_size]
+
     def get_paginated_response(self, data):
-        return Response(data)
+        has_next = "true" if self.has_next else "false"
+        return Response(data, headers={self.has_next_header: has_next})
 
 
 class VariablePageSizePagination(PageNumberPagination):
@@ -29,3 +92,354 @@ class OneHundredResultsPagination(PageNumberPagination):
     page_size = 100
     page_size_query_param = "page_size"
     max_page_size = 100
+
+
+class LookaheadPage(Page):
+    """
+    A page that knows whether another page follows from the rows it fetched, rather
+    than from the paginator's count.
+    """
+
+    def __init__(self, object_list, number, paginator, has_next_rows):
+        self.has_next_rows = has_next_rows
+        super().__init__(object_list, number, paginator)
+
+    def has_next(self):
+        return self.has_next_rows
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Caches the count for each query's SQL, and uses the planner's estimate instead of
+    counting when it is at least estimate_threshold rows.
+
+    Since the count can be stale or estimated, it never limits navigation. Each page
+    fetches one extra row to find out whether another page follows.
+    """
+
+    def __init__(
+        self,
+        object_list,
+        per_page,
+        cache_timeout=60,
+        cache_alias="default",
+        estimate_threshold=None,
+        **kwargs
+    ):
+        self.cache_timeout = cache_timeout
+        self.cache_alias = cache_alias
+        self.estimate_threshold = estimate_threshold
+        self.count_is_estimated = False
+        super().__init__(object_list, per_page, **kwargs)
+
+    def get_count_cache_key(self):
+        try:
+            sql = str(self.object_list.query)
+        except EmptyResultSet:
+            return None
+        sql = " ".join(sql.split())
+        value = "{}:{}".format(self.object_list.db, sql).encode("utf-8")
+        return "rest_framework_helpers.count:{}".format(md5(value).hexdigest())
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+        if self.estimate_threshold is not None:
+            estimate = get_estimated_count(self.object_list)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                self.count_is_estimated = True
+                return estimate
+        key = self.get_count_cache_key()
+        if key is None:
+            return 0
+        cache = caches[self.cache_alias]
+        count = cache.get(key, None)
+        if count is None:
+            count = self.object_list.count()
+            cache.set(key, count, self.cache_timeout)
+        return count
+
+    def validate_number(self, number):
+        if not isinstance(self.object_list, QuerySet):
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_("That page number is not an integer"))
+        if number < 1:
+            raise EmptyPage(_("That page number is less than 1"))
+        return number
+
+    def page(self, number):
+        if not isinstance(self.object_list, QuerySet):
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        if number > 1 and not len(rows):
+            raise EmptyPage(_("That page contains no results"))
+        has_next_rows = len(rows) > self.per_page
+        return LookaheadPage(rows[: self.per_page], number, self, has_next_rows)
+
+
+class CachedCountPagination(PageNumberPagination):
+    """
+    Caches the total count for count_cache_timeout seconds, so repeated page requests
+    for the same query skip the COUNT(*).
+
+    Set count_estimate_threshold to use the planner's estimate for totals at least that
+    large. The response reports whether the count is estimated. The next link is
+    decided from the rows themselves, so an estimate never hides any of them.
+    """
+
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 50
+    count_cache_timeout = 60
+    count_cache_alias = "default"
+    count_estimate_threshold = None
+
+    @property
+    def django_paginator_class(self):
+        return partial(
+            CachedCountPaginator,
+            cache_timeout=self.count_cache_timeout,
+            cache_alias=self.count_cache_alias,
+            estimate_threshold=self.count_estimate_threshold,
+        )
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("count", self.page.paginator.count),
+                    ("count_is_estimated", self.page.paginator.count_is_estimated),
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count_is_estimated"] = {"type": "boolean"}
+        return response_schema
+
+
+class EstimatedCountPagination(CachedCountPagination):
+    """
+    Uses the planner's estimate for totals of 100000 rows or more.
+    """
+
+    count_estimate_threshold = 100000
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginates by the view's order_by_field_name with the pk as a tiebreaker, so each
+    page is a range scan from the last row of the previous one, without an OFFSET or a
+    COUNT(*). The ordering field should not be nullable.
+    """
+
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 50
+    cursor_query_param = "cursor"
+    ordering_attribute = "order_by_field_name"
+    default_ordering = "pk"
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size,
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Returns the ordering field and the pk tiebreaker, in the same direction.
+        """
+        order = getattr(view, self.ordering_attribute, None) or self.default_ordering
+        prefix = "-" if order.startswith("-") else ""
+        field_name = order.lstrip("-")
+        if field_name in ("pk", queryset.model._meta.pk.name):
+            return (prefix + "pk",)
+        return (prefix + field_name, prefix + "pk")
+
+    def get_cursor_value(self, value):
+        """
+        Returns the value as JSON without losing precision, which DjangoJSONEncoder
+        does for times. The ordering field's to_python() reads it back.
+        """
+        if isinstance(value, (datetime.date, datetime.time)):
+            return value.isoformat()
+        if isinstance(value, datetime.timedelta):
+            return duration_iso_string(value)
+        if isinstance(value, (Decimal, UUID)):
+            return str(value)
+        return value
+
+    def encode_cursor(self, position, reverse):
+        position = [self.get_cursor_value(x) for x in position]
+        data = json.dumps([position, reverse])
+        cursor = b64encode(data.encode("utf-8")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_ordering_field(self, model, name):
+        """
+        Returns the model field at the end of an ordering field path.
+        """
+        field = None
+        for bit in name.split("__"):
+            if field is not None:
+                model = field.related_model
+            field = model._meta.pk if bit == "pk" else model._meta.get_field(bit)
+        return field
+
+    def decode_cursor(self, request, model):
+        """
+        Returns the position and direction in the cursor, with each value converted
+        by its ordering field so a tampered cursor is a 404 rather than a bad query.
+        """
+        cursor = request.query_params.get(self.cursor_query_param, None)
+        if cursor is None:
+            return None, False
+        try:
+            position, reverse = json.loads(b64decode(cursor.encode("ascii")))
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError("Wrong number of values.")
+            values = []
+            for order, value in zip(self.ordering, position):
+                field = self.get_ordering_field(model, order.lstrip("-"))
+                value = field.to_python(value)
+                if value is None:
+                    raise ValueError("Cursor values can't be null.")
+                values.append(value)
+        except (
+            TypeError,
+            ValueError,
+            UnicodeError,
+            BinasciiError,
+            DjangoValidationError,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return values, bool(reverse)
+
+    def get_position(self, instance):
+        position = []
+        for order in self.ordering:
+            name = order.lstrip("-")
+            if isinstance(instance, dict):
+                position.append(instance[name])
+                continue
+            value = instance
+            for bit in name.split("__"):
+                value = getattr(value, bit)
+            position.append(value)
+        return position
+
+    def get_position_filter(self, position, reverse):
+        """
+        Returns a Q object for the rows after the position, or before it when reverse.
+        """
+        condition = Q()
+        equal = {}
+        for order, value in zip(self.ordering, position):
+            name = order.lstrip("-")
+            lookup = "lt" if order.startswith("-") != reverse else "gt"
+            condition |= Q(**equal, **{"{}__{}".format(name, lookup): value})
+            equal[name] = value
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.position, reverse = self.decode_cursor(request, queryset.model)
+        position = self.position
+
+        ordering = self.ordering
+        if reverse:
+            ordering = [x[1:] if x.startswith("-") else "-" + x for x in ordering]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(position, reverse))
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not len(self.page):
+            return self.encode_cursor(self.position, False)
+        return self.encode_cursor(self.get_position(self.page[-1]), False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not len(self.page):
+            return self.encode_cursor(self.position, True)
+        return self.encode_cursor(self.get_position(self.page[0]), True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class DataOnlyKeysetPagination(KeysetPagination):
+    """
+    Returns only the data, with the next and previous links in a Link header.
+    """
+
+    def get_paginated_response(self, data):
+        links = []
+        for rel, url in (
+            ("next", self.get_next_link()),
+            ("prev", self.get_previous_link()),
+        ):
+            if url is not None:
+                links.append('<{}>; rel="{}"'.format(url, rel))
+        headers = {"Link": ", ".join(links)} if links else None
+        return Response(data, headers=headers)
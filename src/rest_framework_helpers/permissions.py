@@ -1,5 +1,7 @@
 import os
 import re
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
 
@@ -9,6 +11,7 @@ class IsRelated(BasePermission):
     or exists in the target fields objects.
     """
 
+    cost = 10
     target_field = None
 
     def get_field(self, obj):
@@ -60,15 +63,69 @@ class IsRelated(BasePermission):
 
         # If the user matches the nested field, return true.
         try:
-            if current_user == field or current_user in field.all():
+            if current_user == field or self.is_member(current_user, field):
                 return True
             # Else, return False
             return False
         except AttributeError:
             return False
 
+    def is_member(self, current_user, field):
+        # Use the prefetched objects when they exist, otherwise ask the database
+        # without loading the related objects.
+        queryset = field.all()
+        if getattr(queryset, "_result_cache", None) is not None:
+            return current_user in queryset
+        return queryset.filter(pk=current_user.pk).exists()
+
     def has_object_permission(self, request, view, obj):
-        return self.is_related(request.user, obj)
+        # Remember the result for the rest of the request.
+        pk = getattr(obj, "pk", None)
+        if pk is None:
+            return self.is_related(request.user, obj)
+        results = getattr(request, "_is_related_results", None)
+        if results is None:
+            results = request._is_related_results = {}
+        key = (type(self), obj.__class__, self.target_field, pk)
+        if key not in results:
+            results[key] = self.is_related(request.user, obj)
+        return results[key]
+
+    def get_lookup(self, model):
+        """
+        Returns the target field as an ORM lookup on the model, or None when part of it
+        is a property or other plain attribute rather than a model field.
+        """
+        bits = self.target_field.split(".")
+        for index, bit in enumerate(bits):
+            if model is None:
+                return None
+            try:
+                field = model._meta.pk if bit == "pk" else model._meta.get_field(bit)
+            except FieldDoesNotExist:
+                return None
+            if index < len(bits) - 1 and not field.is_relation:
+                return None
+            model = field.related_model
+        return "__".join(bits)
+
+    def filter_queryset(self, request, view, queryset):
+        """
+        Returns a Q object that matches the objects related to the current user, or None
+        when the target field can't be queried so each object is checked instead.
+        """
+        user = self.get_actual_object(request.user)
+        if not user.is_authenticated:
+            return Q(pk__in=[])
+        if issubclass(queryset.model, type(user)):
+            return Q(pk=user.pk)
+        if self.target_field is None:
+            return Q(pk__in=[])
+        lookup = self.get_lookup(queryset.model)
+        if lookup is None:
+            return None
+        related = queryset.model._default_manager.filter(**{lookup: user})
+        return Q(pk__in=related.values("pk"))
 
 
 class AllowNone(BasePermission):
@@ -76,18 +133,25 @@ class AllowNone(BasePermission):
     Always returns False
     """
 
+    cost = 0
+
     def has_permission(self, request, view):
         return False
 
     def has_object_permission(self, request, view, obj):
         return False
 
+    def filter_queryset(self, request, view, queryset):
+        return Q(pk__in=[])
+
 
 class IsAnonymous(BasePermission):
     """
     Returns True if the current requesting user is anonymous.
     """
 
+    cost = 1
+
     def is_anonymous(self, request):
         return request.user.is_anonymous()
 
@@ -100,6 +164,7 @@ class IsAction(BasePermission):
     Returns True if the view action matches the specified action.
     """
 
+    cost = 0
     target_action = None
 
     def is_action(self, view):
@@ -141,6 +206,7 @@ class IsMethod(BasePermission):
     Returns True if the request method matches the target method.
     """
 
+    cost = 0
     target_method = None
 
     def is_method(self, request):
@@ -186,6 +252,8 @@ class IsReadOnlyRequest(BasePermission):
     Return True if the request method is one of GET, HEAD, OPTIONS
     """
 
+    cost = 0
+
     def has_permission(self, request, view):
         return request.method in SAFE_METHODS
 
@@ -195,6 +263,7 @@ class HasQueryParams(BasePermission):
     Returns True if specific query params are present in the request.
     """
 
+    cost = 0
     target_params = None
 
     def has_params(self, request):
@@ -222,6 +291,8 @@ class ReadOnlyExceptForStaff(BasePermission):
     Returns True if the user is staff or the object matches the requesting user.
     """
 
+    cost = 1
+
     def has_permission(self, request, view):
         # allow user to list all users if logged in user is staff
         return view.action == "retrieve" or request.user.is_staff
@@ -230,12 +301,21 @@ class ReadOnlyExceptForStaff(BasePermission):
         # allow logged in user to view own details, allows staff to view all records
         return request.user.is_staff or obj == request.user
 
+    def filter_queryset(self, request, view, queryset):
+        user = request.user
+        if user.is_staff:
+            return Q()
+        if user.is_authenticated and isinstance(user, queryset.model):
+            return Q(pk=user.pk)
+        return Q(pk__in=[])
+
 
 class HasAllowedReferer(BasePermission):
     """
     Returns True if the request's referer matches one of the accepted referers.
     """
 
+    cost = 0
     allowed_prefixes = None
     allowed_suffixes = None
 
@@ -277,6 +357,7 @@ class HasAllowedUserAgent(BasePermission):
     Returns True if the request's user agent matches one of the allowed user agents.
     """
 
+    cost = 0
     user_agents_allowed = None
 
     def get_user_agents_allowed(self):
@@ -301,6 +382,7 @@ class DoesNotHaveBlockedIPAddress(BasePermission):
     Returns False if the IP address of the current request is specified as blocked.
     """
 
+    cost = 0
     ip_addresses_blocked = None
     fallback_result = False
 
@@ -328,6 +410,7 @@ class HasAllowedIPAddress(BasePermission):
     Return True only if the IP address of the current request is in the list.
     """
 
+    cost = 0
     ip_addresses_allowed = None
 
     def get_ip_addressed_allowed(self):
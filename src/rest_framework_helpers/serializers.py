@@ -1,5 +1,9 @@
+from collections.abc import Mapping
+from django.db import transaction
 from rest_framework.serializers import HyperlinkedModelSerializer, ListSerializer
 
+from .utils import bulk_upsert, get_objects_for_lookups
+
 
 class NoEmptyListSerializer(ListSerializer):
     def to_representation(self, data):
@@ -8,6 +12,132 @@ class NoEmptyListSerializer(ListSerializer):
         return res
 
 
+class GetOrCreateListSerializer(ListSerializer):
+    """
+    A ListSerializer for serializers using the GetOrCreateMixin. Existing objects are
+    found with one query per lookup shape, and the rest are created with bulk_create
+    in a single transaction.
+
+    If the child declares natural_key_fields, the items are upserted without any
+    lookups instead.
+    """
+
+    lookup_batch_size = 500
+    create_batch_size = 500
+
+    def get_lookup_kwargs(self, data):
+        if not isinstance(data, Mapping):
+            return None
+        get_lookup_kwargs = getattr(self.child, "get_lookup_kwargs", None)
+        if get_lookup_kwargs is None:
+            return dict(data)
+        return dict(get_lookup_kwargs(data))
+
+    def get_natural_key_fields(self):
+        get_natural_key_fields = getattr(self.child, "get_natural_key_fields", None)
+        if get_natural_key_fields is None:
+            return None
+        return get_natural_key_fields()
+
+    def get_existing_instances(self, data):
+        """
+        Returns the existing object (or None) for each item of data.
+        """
+        model = self.child.Meta.model
+        indexes = []
+        lookups = []
+        for index, item in enumerate(data):
+            lookup = self.get_lookup_kwargs(item)
+            if lookup:
+                indexes.append(index)
+                lookups.append(lookup)
+        found = get_objects_for_lookups(
+            model._default_manager.all(),
+            lookups,
+            batch_size=self.lookup_batch_size,
+            unique=True,
+        )
+        instances = [None] * len(data)
+        for index, instance in zip(indexes, found):
+            instances[index] = instance
+        return instances
+
+    def is_valid(self, raise_exception=False):
+        self.existing_instances = {}
+        self.matched_instances = []
+        data = getattr(self, "initial_data", None)
+        if isinstance(data, list) and self.get_natural_key_fields() is None:
+            instances = self.get_existing_instances(data)
+            for item, instance in zip(data, instances):
+                if instance is not None:
+                    self.existing_instances[id(item)] = instance
+        return super().is_valid(raise_exception=raise_exception)
+
+    def run_child_validation(self, data):
+        # Validate against the existing object, as the GetOrCreateMixin does.
+        instance = self.existing_instances.get(id(data), None)
+        self.child.instance = instance
+        try:
+            validated = super().run_child_validation(data)
+        finally:
+            self.child.instance = None
+        self.matched_instances.append(instance)
+        return validated
+
+    def upsert(self, validated_data):
+        """
+        Upserts the items on their natural key, with one statement per batch for each
+        set of submitted fields.
+        """
+        model = self.child.Meta.model
+        natural_key_fields = self.get_natural_key_fields()
+        many_to_many = set(x.name for x in model._meta.many_to_many)
+        instances = [None] * len(validated_data)
+        shapes = {}
+        with transaction.atomic():
+            for index, attrs in enumerate(validated_data):
+                if many_to_many & set(attrs):
+                    instances[index] = self.child.create(attrs)
+                else:
+                    shapes.setdefault(tuple(sorted(attrs)), []).append(index)
+            for shape, indexes in shapes.items():
+                update_fields = self.child.get_upsert_update_fields(shape)
+                objs = [model(**validated_data[x]) for x in indexes]
+                objs = bulk_upsert(
+                    model,
+                    objs,
+                    natural_key_fields,
+                    update_fields,
+                    batch_size=self.create_batch_size,
+                )
+                for index, obj in zip(indexes, objs):
+                    instances[index] = obj
+        return instances
+
+    def create(self, validated_data):
+        if self.get_natural_key_fields() is not None:
+            return self.upsert(validated_data)
+
+        model = self.child.Meta.model
+        many_to_many = set(x.name for x in model._meta.many_to_many)
+        instances = []
+        created = []
+        with transaction.atomic():
+            for attrs, instance in zip(validated_data, self.matched_instances):
+                if instance is not None:
+                    instances.append(instance)
+                elif many_to_many & set(attrs):
+                    instances.append(self.child.create(attrs))
+                else:
+                    instance = model(**attrs)
+                    created.append(instance)
+                    instances.append(instance)
+            model._default_manager.bulk_create(
+                created, batch_size=self.create_batch_size
+            )
+        return instances
+
+
 class DynamicFieldsModelSerializer(HyperlinkedModelSerializer):
     """
     A HyperlinkedModelSerializer that takes an additional `fields` argument that
@@ -6,9 +6,24 @@ from django.db.models.fields.related import (
     ForeignKey,
     OneToOneField,
 )
-from django.db.models import Manager
+from django.core.exceptions import EmptyResultSet, FieldError, ValidationError
+from django.db import connections, transaction
+from django.db.models import F, Manager, Q, UniqueConstraint
+from django.urls import (
+    get_resolver,
+    get_script_prefix,
+    get_urlconf,
+    reverse,
+    NoReverseMatch,
+)
+from django.urls.resolvers import get_ns_resolver
 from django.db.models.query import QuerySet
+import json
 from collections import OrderedDict
+from functools import reduce
+from operator import or_
+from threading import Lock
+from urllib.parse import quote
 
 REVERSE_RELS = (ManyToOneRel, OneToOneRel, ForeignObjectRel)
 RELS = (ManyToManyField, ForeignKey, OneToOneField)
@@ -538,3 +553,349 @@ class HashableDict(dict):
                 else:
                     vals += (str(v),)
         return hash((frozenset(self), frozenset(vals)))
+
+
+class LRUCache:
+    """
+    A bounded mapping that discards the least recently used key once it is full.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            try:
+                self.data.move_to_end(key)
+            except KeyError:
+                return default
+            return self.data[key]
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __len__(self):
+        return len(self.data)
+
+
+URL_PLACEHOLDER = "5937162048{:02d}"
+# Characters django's reverse() leaves unquoted in urls.
+URL_SAFE_CHARS = "!$&'()*+,;=/~:@"
+
+
+def compile_url_template(view_name, url_params, format=None):
+    """
+    Reverses the view once with placeholder values, and returns a format string that
+    builds the same url for any values. Returns None if the url cannot be compiled.
+    """
+    placeholders = {}
+    kwargs = {}
+    for i, url_param in enumerate(url_params):
+        placeholder = URL_PLACEHOLDER.format(i)
+        placeholders[url_param] = placeholder
+        kwargs[url_param] = placeholder
+    if format:
+        kwargs["format"] = format
+    try:
+        url = reverse(view_name, kwargs=kwargs)
+    except NoReverseMatch:
+        return None
+    template = url.replace("{", "{{").replace("}", "}}")
+    for url_param, placeholder in placeholders.items():
+        if template.count(placeholder) != 1:
+            return None
+        template = template.replace(placeholder, "{%s}" % url_param)
+    return template
+
+
+def compile_url_pattern(view_name, url_params, format=None):
+    """
+    Returns the (candidate, regex, converters) that reverse() checks the values for
+    the view's url against, or None if the compiled template can't rely on it.
+    """
+    resolver = get_resolver(get_urlconf())
+    *path, view = view_name.split(":")
+    ns_pattern = ""
+    ns_converters = {}
+    for ns in path:
+        app_list = resolver.app_dict.get(ns, [])
+        if len(app_list) and ns not in app_list:
+            ns = app_list[0]
+        try:
+            extra, resolver = resolver.namespace_dict[ns]
+        except KeyError:
+            return None
+        ns_pattern += extra
+        ns_converters.update(resolver.pattern.converters)
+    if ns_pattern:
+        resolver = get_ns_resolver(ns_pattern, resolver, tuple(ns_converters.items()))
+
+    names = set(url_params)
+    if format:
+        names.add("format")
+    for possibility, pattern, defaults, converters in resolver.reverse_dict.getlist(
+        view
+    ):
+        for result, params in possibility:
+            if names.symmetric_difference(params).difference(defaults):
+                continue
+            if any(k in names and k not in params for k in defaults):
+                return None
+            url_pattern = (result, re.compile("^" + pattern), converters)
+            # The template is only built from this pattern if the placeholders
+            # matched it, otherwise reverse() used a later one.
+            placeholders = {
+                url_param: URL_PLACEHOLDER.format(i)
+                for i, url_param in enumerate(url_params)
+            }
+            if match_url_pattern(url_pattern, placeholders, format) is None:
+                return None
+            return url_pattern
+    return None
+
+
+def match_url_pattern(url_pattern, url_kwargs, format=None):
+    """
+    Returns the url kwargs converted to text, or None when reverse() wouldn't build
+    the url from the pattern with them.
+    """
+    result, regex, converters = url_pattern
+    values = {}
+    for k, v in url_kwargs.items():
+        if k in converters:
+            try:
+                values[k] = converters[k].to_url(v)
+            except ValueError:
+                return None
+        else:
+            values[k] = str(v)
+    subs = dict(values)
+    if format:
+        subs["format"] = format
+    if regex.search(result % subs) is None:
+        return None
+    return values
+
+
+def get_absolute_uri_prefix(request):
+    """
+    Returns the scheme and host for the request, computed once per request.
+    """
+    prefix = getattr(request, "_absolute_uri_prefix", None)
+    if prefix is None:
+        prefix = request.build_absolute_uri("/")[:-1]
+        request._absolute_uri_prefix = prefix
+    return prefix
+
+
+compiled_urls = {}
+
+
+def get_compiled_url(view_name, url_params, format=None):
+    """
+    Returns the (template, url_pattern) that build the view's urls, compiled once for
+    each urlconf and script prefix, or (None, None) when they must be reversed.
+    """
+    key = (view_name, url_params, format, get_script_prefix(), get_urlconf())
+    try:
+        return compiled_urls[key]
+    except KeyError:
+        pass
+    template = compile_url_template(view_name, url_params, format)
+    url_pattern = compile_url_pattern(view_name, url_params, format)
+    if template is None or url_pattern is None:
+        template = url_pattern = None
+    compiled = compiled_urls[key] = (template, url_pattern)
+    return compiled
+
+
+def build_compiled_url(compiled, url_kwargs, format=None, request=None):
+    """
+    Returns the url for the kwargs from a get_compiled_url() result, absolute when a
+    request is given, or None when reverse() has to build it.
+    """
+    template, url_pattern = compiled
+    if template is None:
+        return None
+    values = match_url_pattern(url_pattern, url_kwargs, format)
+    if values is None:
+        return None
+    url = template.format_map(
+        {k: quote(v, safe=URL_SAFE_CHARS) for k, v in values.items()}
+    )
+    if request is None:
+        return url
+    return get_absolute_uri_prefix(request) + url
+
+
+def get_lookup_key(output_fields, values):
+    key = ()
+    for output_field, value in zip(output_fields, values):
+        try:
+            value = output_field.to_python(value)
+        except (ValidationError, ValueError, TypeError):
+            pass
+        key += (str(value),)
+    return key
+
+
+def filter_lookups(queryset, shape, lookups):
+    """
+    Returns the objects that match any of the lookups, which all use the same fields.
+    """
+    if len(shape) == 1:
+        values = [x[shape[0]] for x in lookups]
+        condition = Q(**{"{}__in".format(shape[0]): values})
+    else:
+        condition = reduce(or_, [Q(**x) for x in lookups])
+    try:
+        return list(queryset.filter(condition))
+    except (ValidationError, ValueError, TypeError):
+        # A malformed value spoils the whole query, so look each one up.
+        objects = []
+        for lookup in lookups:
+            try:
+                objects.extend(queryset.filter(**lookup)[:2])
+            except (ValidationError, ValueError, TypeError):
+                continue
+        return objects
+
+
+def get_objects_for_lookups(queryset, lookups, batch_size=None, unique=False):
+    """
+    Given a list of lookup kwargs, returns the matching object (or None) for each, using
+    one query for every distinct set of lookup fields (and batch of lookups).
+
+    If unique is True, lookups that match more than one object return None.
+    """
+    shapes = OrderedDict()
+    for lookup in lookups:
+        shapes.setdefault(tuple(sorted(lookup)), []).append(lookup)
+
+    found = {}
+    output_fields = {}
+    for shape, shape_lookups in shapes.items():
+        aliases = OrderedDict()
+        for i, lookup_field in enumerate(shape):
+            aliases["bulk_lookup_{}".format(i)] = F(lookup_field)
+        try:
+            annotated = queryset.annotate(**aliases)
+        except FieldError:
+            continue
+        fields = output_fields[shape] = [
+            annotated.query.annotations[x].output_field for x in aliases
+        ]
+        size = batch_size or len(shape_lookups)
+        for start in range(0, len(shape_lookups), size):
+            batch = shape_lookups[start : start + size]
+            for obj in filter_lookups(annotated, shape, batch):
+                values = [getattr(obj, x) for x in aliases]
+                key = (shape, get_lookup_key(fields, values))
+                if key not in found:
+                    found[key] = obj
+                elif unique and found[key] is not None and found[key].pk != obj.pk:
+                    found[key] = None
+
+    results = []
+    for lookup in lookups:
+        shape = tuple(sorted(lookup))
+        if shape not in output_fields:
+            results.append(None)
+            continue
+        values = [lookup[x] for x in shape]
+        key = (shape, get_lookup_key(output_fields[shape], values))
+        results.append(found.get(key))
+    return results
+
+
+def has_unique_constraint(model, field_names):
+    """
+    Returns True if the model has a unique field or unconditional unique constraint on
+    exactly the field names given.
+    """
+    meta = model._meta
+    target = set(meta.pk.name if x == "pk" else x for x in field_names)
+    unique_sets = [set([x.name]) for x in meta.concrete_fields if x.unique]
+    unique_sets += [set(x) for x in meta.unique_together]
+    for constraint in meta.constraints:
+        if isinstance(constraint, UniqueConstraint):
+            if constraint.condition is None and len(constraint.fields):
+                unique_sets.append(set(constraint.fields))
+    return target in unique_sets
+
+
+def bulk_upsert(model, objs, unique_fields, update_fields=None, batch_size=None):
+    """
+    Inserts the objects in one statement per batch. Rows that conflict on the unique
+    fields are updated with update_fields, or left alone if there are none.
+
+    Backends that cannot do this fall back to update_or_create for each object.
+    Returns the saved objects, in order.
+    """
+    manager = model._default_manager
+    features = connections[manager.db].features
+    unique_fields = list(unique_fields)
+    update_fields = list(update_fields or [])
+    if len(update_fields) and features.supports_update_conflicts_with_target:
+        manager.bulk_create(
+            objs,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=update_fields,
+        )
+    elif not len(update_fields) and features.supports_ignore_conflicts:
+        manager.bulk_create(objs, batch_size=batch_size, ignore_conflicts=True)
+    else:
+        saved = []
+        with transaction.atomic(using=manager.db):
+            attnames = [model._meta.get_field(x).attname for x in unique_fields]
+            for obj in objs:
+                lookup = {x: getattr(obj, x) for x in attnames}
+                defaults = {x: getattr(obj, x) for x in update_fields}
+                instance, _ = manager.update_or_create(defaults=defaults, **lookup)
+                saved.append(instance)
+        return saved
+
+    # Conflicting rows are not returned by every backend, so fetch what is missing.
+    missing = [x for x in objs if x.pk is None]
+    if len(missing):
+        attnames = [model._meta.get_field(x).attname for x in unique_fields]
+        lookups = [{x: getattr(obj, x) for x in attnames} for obj in missing]
+        found = get_objects_for_lookups(manager.all(), lookups, batch_size)
+        existing = dict(zip([id(x) for x in missing], found))
+        objs = [existing.get(id(x)) or x for x in objs]
+    return objs
+
+
+def get_estimated_count(queryset):
+    """
+    Returns the planner's estimate of the rows the queryset returns, or None when the
+    database can't give one cheaply.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN (FORMAT JSON) {}".format(sql), params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
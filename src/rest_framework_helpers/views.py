@@ -1,27 +1,29 @@
+import json
 from collections import OrderedDict
+from hashlib import md5
+from types import MappingProxyType
+from django.http import HttpResponseNotModified
+from django.urls import get_script_prefix, get_urlconf
 from rest_framework.reverse import reverse
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .utils import LRUCache
+
 
 class APIRootView(APIView):
+    """
+    Lists the endpoints as absolute urls.
+
+    The urls are built once for each host, scheme, format and set of endpoints, and
+    kept in a bounded cache. Responses carry an ETag, so clients that send it back in
+    If-None-Match get a 304 without the urls being reversed again.
+    """
+
     endpoints = {}
-    endpoints_seen = {}
-    endpoints_created = None
     view_name_prefix = ""
     view_name_suffix = ""
-
-    def is_endpoints_changed(self, endpoints, seen, created):
-        changed = False
-        if created is None:
-            changed = True
-        for name, view_name in endpoints.items():
-            if changed is True:
-                break
-            if name not in seen or seen[name] != view_name:
-                seen[name] = view_name
-                changed = True
-        return changed
+    endpoints_cache = LRUCache(256)
 
     def get_full_view_name(self, name):
         prefix = self.view_name_prefix
@@ -38,6 +40,12 @@ class APIRootView(APIView):
         name = name.replace(r":+", ":")
         return name
 
+    def filter_endpoints(self, endpoints):
+        """
+        Returns the endpoints to list. Override to leave some out.
+        """
+        return endpoints
+
     def create_endpoints(self, request, format, endpoints):
         created = OrderedDict()
         for name, view_name in endpoints.items():
@@ -45,16 +53,63 @@ class APIRootView(APIView):
             created[name] = reverse(full_view_name, request=request, format=format)
         return created
 
+    def get_endpoints_cache_key(self, request, format, endpoints):
+        return (
+            self.__class__,
+            request.scheme,
+            request.get_host(),
+            format,
+            getattr(request, "version", None),
+            get_script_prefix(),
+            get_urlconf(),
+            tuple(endpoints.items()),
+        )
+
+    def get_cached_endpoints(self, request, format):
+        """
+        Returns a read-only mapping of the endpoints and a digest of its contents.
+        """
+        endpoints = self.filter_endpoints(OrderedDict(self.endpoints))
+        key = self.get_endpoints_cache_key(request, format, endpoints)
+        cached = self.endpoints_cache.get(key)
+        if cached is None:
+            created = self.create_endpoints(request, format, endpoints)
+            digest = md5(json.dumps(created).encode("utf-8")).hexdigest()
+            cached = (MappingProxyType(created), digest)
+            self.endpoints_cache.set(key, cached)
+        self._cached_endpoints = cached
+        return cached
+
     def get_endpoints(self, request, format):
-        endpoints = self.endpoints
-        seen = self.endpoints_seen
-        created = self.endpoints_created
-        changed = self.is_endpoints_changed(endpoints, seen, created)
-        if changed is True:
-            created = self.endpoints_created = self.create_endpoints(
-                request, format, endpoints
-            )
-        return created
+        endpoints, _ = self.get_cached_endpoints(request, format)
+        return endpoints
+
+    def get_endpoints_digest(self, endpoints):
+        # Reuse the cached digest unless an override returned different endpoints.
+        cached = getattr(self, "_cached_endpoints", None)
+        if cached is not None and cached[0] is endpoints:
+            return cached[1]
+        return md5(json.dumps(dict(endpoints)).encode("utf-8")).hexdigest()
+
+    def get_etag(self, request, digest):
+        # The html and json renderings of the same endpoints are different entities.
+        media_type = getattr(request, "accepted_media_type", "")
+        value = "{}:{}".format(digest, media_type).encode("utf-8")
+        return '"{}"'.format(md5(value).hexdigest())
+
+    def is_not_modified(self, request, etag):
+        if_none_match = request.META.get("HTTP_IF_NONE_MATCH", None)
+        if if_none_match is None:
+            return False
+        etags = [x.strip() for x in if_none_match.split(",")]
+        return etag in etags or "*" in etags
 
     def get(self, request, format=None):
-        return Response(self.get_endpoints(request, format))
+        endpoints = self.get_endpoints(request, format)
+        etag = self.get_etag(request, self.get_endpoints_digest(endpoints))
+        if self.is_not_modified(request, etag):
+            # A plain response, so no renderer builds a body for it.
+            response = HttpResponseNotModified()
+            response["ETag"] = etag
+            return response
+        return Response(endpoints, headers={"ETag": etag})
@@ -0,0 +1,48 @@
+import django
+import pytest
+from django.conf import settings
+
+
+def pytest_configure():
+    if settings.configured:
+        return
+    settings.configure(
+        DATABASES={
+            "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}
+        },
+        INSTALLED_APPS=[
+            "django.contrib.contenttypes",
+            "django.contrib.auth",
+            "rest_framework",
+            "tests",
+        ],
+        ROOT_URLCONF="tests.urls",
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        },
+        ALLOWED_HOSTS=["testserver"],
+        TEMPLATES=[
+            {
+                "BACKEND": "django.template.backends.django.DjangoTemplates",
+                "APP_DIRS": True,
+            }
+        ],
+        USE_TZ=True,
+    )
+    django.setup()
+
+    from django.core.management import call_command
+
+    call_command("migrate", run_syncdb=True, verbosity=0)
+
+
+@pytest.fixture(autouse=True)
+def db():
+    """
+    Runs each test in a transaction that is rolled back afterwards.
+    """
+    from django.db import transaction
+
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
@@ -0,0 +1,21 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Item(models.Model):
+    sku = models.CharField(max_length=32, unique=True)
+    name = models.CharField(max_length=100)
+    quantity = models.IntegerField(default=0)
+    created = models.DateTimeField(default=timezone.now)
+    owner = models.ForeignKey(
+        "auth.User", null=True, blank=True, on_delete=models.CASCADE
+    )
+
+
+class KeptItem(Item):
+    class Meta:
+        proxy = True
+
+    @property
+    def keeper(self):
+        return self.owner
@@ -0,0 +1,87 @@
+from rest_framework import generics, serializers
+from rest_framework.test import APIRequestFactory
+
+from rest_framework_helpers.filters import QuerystringFilter
+
+from .models import Item
+
+
+class ItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Item
+        fields = ["sku", "quantity"]
+
+
+class ItemList(QuerystringFilter, generics.ListAPIView):
+    queryset = Item.objects.order_by("sku")
+    serializer_class = ItemSerializer
+    querystring_filter_fields = {
+        "sku": ["exact", "in"],
+        "quantity": ["exact", "in", "gte"],
+        "owner__username": ["exact"],
+        "name__foo": ["exact"],
+    }
+    querystring_filter_unindexed_fields = ["quantity"]
+
+
+class GetFieldNamesItemList(QuerystringFilter, generics.ListAPIView):
+    queryset = Item.objects.order_by("sku")
+    serializer_class = ItemSerializer
+
+    def get_field_names(self):
+        return ["sku", "name"]
+
+
+def get(view_class, **params):
+    request = APIRequestFactory().get("/", params)
+    return view_class.as_view()(request)
+
+
+def create_items():
+    Item.objects.create(sku="a", name="a", quantity=1)
+    Item.objects.create(sku="b", name="b", quantity=2)
+    Item.objects.create(sku="c", name="c", quantity=3)
+
+
+def test_querystring_filter_coerces_values():
+    create_items()
+    response = get(ItemList, quantity__in="1,3")
+    assert [x["sku"] for x in response.data] == ["a", "c"]
+    response = get(ItemList, quantity__gte="2")
+    assert [x["sku"] for x in response.data] == ["b", "c"]
+    response = get(ItemList, sku__in="a,b")
+    assert [x["sku"] for x in response.data] == ["a", "b"]
+
+
+def test_querystring_filter_rejects_invalid_values():
+    create_items()
+    response = get(ItemList, quantity__in="1,x")
+    assert response.status_code == 400
+    assert list(response.data) == ["quantity__in"]
+
+
+def test_querystring_filter_rejects_unindexed_fields():
+    create_items()
+    # The related username is unique, so it is allowed.
+    assert get(ItemList, owner__username="me").status_code == 200
+    response = get(GetFieldNamesItemList, name="a")
+    assert response.status_code == 400
+    assert list(response.data) == ["name"]
+    response = get(GetFieldNamesItemList, sku="a")
+    assert [x["sku"] for x in response.data] == ["a"]
+
+
+def test_querystring_filter_allows_opted_in_unindexed_fields():
+    create_items()
+    response = get(ItemList, quantity="2")
+    assert response.status_code == 200
+    assert [x["sku"] for x in response.data] == ["b"]
+
+
+def test_querystring_filter_ignores_paths_through_non_relations():
+    create_items()
+    view = ItemList()
+    assert view.get_querystring_filter_field(Item, "name__foo") == (None, False)
+    response = get(ItemList, name__foo="a")
+    assert response.status_code == 200
+    assert len(response.data) == 3
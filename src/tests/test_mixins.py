@@ -0,0 +1,259 @@
+import json
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.http import Http404, QueryDict
+from django.test.utils import CaptureQueriesContext
+from django.urls import NoReverseMatch
+from rest_framework import serializers, viewsets
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+
+from rest_framework_helpers.fields import ParameterisedHyperlinkedIdentityField
+from rest_framework_helpers.mixins import (
+    HyperlinkListMixin,
+    MeAliasMixin,
+    ObjectCacheMixin,
+    RepresentationMixin,
+)
+
+from .models import Item
+
+
+class UpperField(serializers.CharField):
+    def get_attribute(self, instance):
+        return super().get_attribute(instance).upper()
+
+
+class ItemSerializer(RepresentationMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Item
+        fields = ["sku", "name"]
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.context.get("upper", False):
+            fields["name"] = UpperField()
+        return fields
+
+
+def test_representation_plan_is_keyed_on_the_field_class():
+    item = Item(sku="a", name="name")
+    assert ItemSerializer(item).data["name"] == "name"
+    # The same name and source with another field class has its own getter.
+    assert ItemSerializer(item, context={"upper": True}).data["name"] == "NAME"
+    assert ItemSerializer(item).data["name"] == "name"
+
+
+class ItemUrlSerializer(serializers.ModelSerializer):
+    url = ParameterisedHyperlinkedIdentityField(
+        view_name="item-detail", lookup_fields=[("sku", "sku")]
+    )
+
+    class Meta:
+        model = Item
+        fields = ["url", "sku"]
+
+
+class PrefixedUrlField(ParameterisedHyperlinkedIdentityField):
+    def get_url_kwargs(self, obj):
+        return {"sku": "item-" + obj.sku}
+
+
+class PrefixedUrlSerializer(ItemUrlSerializer):
+    url = PrefixedUrlField(view_name="item-detail", lookup_fields=[("sku", "sku")])
+
+
+def get_url_list(serializer_class):
+    view = type(
+        "ItemUrls",
+        (HyperlinkListMixin, viewsets.GenericViewSet),
+        {
+            "queryset": Item.objects.order_by("sku"),
+            "serializer_class": serializer_class,
+        },
+    )
+    request = APIRequestFactory().get("/")
+    with CaptureQueriesContext(connection) as context:
+        response = view.as_view({"get": "list"})(request)
+    return response, context.captured_queries
+
+
+def test_hyperlink_list_builds_urls_from_columns():
+    Item.objects.create(sku="a b", name="a")
+    response, queries = get_url_list(ItemUrlSerializer)
+    assert response.data == ["http://testserver/items/a%20b/"]
+    # Only the lookup column is fetched.
+    assert len(queries) == 1
+    assert '"name"' not in queries[0]["sql"]
+
+
+def test_hyperlink_list_reverses_values_the_pattern_rejects():
+    Item.objects.create(sku="c/d", name="c")
+    with pytest.raises(NoReverseMatch):
+        get_url_list(ItemUrlSerializer)
+
+
+def test_hyperlink_list_uses_overridden_url_fields():
+    Item.objects.create(sku="a", name="a")
+    response, _ = get_url_list(PrefixedUrlSerializer)
+    assert response.data == ["http://testserver/items/item-a/"]
+
+
+class MeView(MeAliasMixin, APIView):
+    seen = None
+
+    def get(self, request, **kwargs):
+        self.seen.update(request=request, data=request.data, kwargs=kwargs)
+        return Response()
+
+    post = get
+
+
+def call_me_view(method, path, user=None, **extra):
+    request = getattr(APIRequestFactory(), method)(path, **extra)
+    if user is not None:
+        force_authenticate(request, user=user)
+    seen = {}
+    MeView.as_view(seen=seen)(request)
+    return seen
+
+
+@pytest.fixture
+def user():
+    return User.objects.create(username="bob")
+
+
+def test_me_alias_query_params_keep_their_type(user):
+    seen = call_me_view("get", "/?owner=me&owner=me&url=/users/me/&n=1", user)
+    query_params = seen["request"].query_params
+    assert isinstance(query_params, QueryDict)
+    assert query_params is seen["request"]._request.GET
+    assert query_params._mutable is False
+    assert query_params["owner"] == "bob"
+    assert query_params.get("url") == "/users/bob/"
+    assert query_params.getlist("owner") == ["bob", "bob"]
+    assert query_params.dict() == {"owner": "bob", "url": "/users/bob/", "n": "1"}
+    assert "owner=bob" in query_params.urlencode()
+    copied = query_params.copy()
+    assert type(copied) is QueryDict
+    assert copied._mutable is True
+    assert copied.getlist("owner") == ["bob", "bob"]
+
+
+def test_me_alias_json_data_keeps_its_type(user):
+    data = {"owner": "me", "url": "/users/me/", "n": 1}
+    seen = call_me_view("post", "/", user, data=data, format="json")
+    request_data = seen["data"]
+    assert isinstance(request_data, dict)
+    assert request_data["owner"] == "bob"
+    assert dict(request_data)["url"] == "/users/bob/"
+    assert json.loads(json.dumps(request_data)) == {
+        "owner": "bob",
+        "url": "/users/bob/",
+        "n": 1,
+    }
+    assert type(request_data.copy()) is dict
+    request_data["extra"] = "me"
+    assert request_data["extra"] == "bob"
+
+
+def test_me_alias_form_data_keeps_files(user):
+    upload = SimpleUploadedFile("a.txt", b"content")
+    data = {"owner": "me", "upload": upload}
+    seen = call_me_view("post", "/", user, data=data, format="multipart")
+    request_data = seen["data"]
+    assert isinstance(request_data, QueryDict)
+    assert request_data["owner"] == "bob"
+    assert request_data["upload"].read() == b"content"
+
+
+def test_me_alias_is_left_for_anonymous_users():
+    seen = call_me_view("get", "/?owner=me")
+    assert seen["request"].query_params["owner"] == "me"
+
+
+def test_me_alias_resolves_url_kwargs(user):
+    request = APIRequestFactory().get("/")
+    # The url kwargs are resolved before DRF authenticates, from the middleware's user.
+    request.user = user
+    seen = {}
+    MeView.as_view(seen=seen)(request, user__username="me", pk="1")
+    assert seen["kwargs"] == {"user__username": "bob", "pk": "1"}
+
+
+class CachedLookup(ObjectCacheMixin):
+    object_cache_timeout = 60
+
+
+def get_cached(queryset, **object_kwargs):
+    with CaptureQueriesContext(connection) as queries:
+        obj = CachedLookup().get_cached_object(queryset, object_kwargs)
+    return obj, len(queries)
+
+
+@pytest.fixture
+def cached_item():
+    cache.clear()
+    item = Item.objects.create(sku="a", name="old", quantity=1)
+    assert get_cached(Item.objects.all(), sku="a")[1] == 1
+    return item
+
+
+def test_object_cache_hits_without_queries(cached_item):
+    obj, queries = get_cached(Item.objects.all(), sku="a")
+    assert queries == 0
+    assert obj.pk == cached_item.pk
+
+
+def test_object_cache_refetches_after_save(cached_item):
+    cached_item.name = "new"
+    cached_item.save()
+    obj, queries = get_cached(Item.objects.all(), sku="a")
+    assert queries == 1
+    assert obj.name == "new"
+    assert get_cached(Item.objects.all(), sku="a")[1] == 0
+
+
+def test_object_cache_refetches_after_delete(cached_item):
+    cached_item.delete()
+    with pytest.raises(Http404):
+        get_cached(Item.objects.all(), sku="a")
+
+
+def test_object_cache_refetches_after_the_counter_expires(cached_item):
+    key = CachedLookup.get_object_cache_generation_key(
+        CachedLookup.object_cache_prefix, Item, cached_item.pk
+    )
+    cache.delete(key)
+    cached_item.name = "new"
+    cached_item.save()
+    assert cache.get(key) is not None
+    obj, queries = get_cached(Item.objects.all(), sku="a")
+    assert queries == 1
+    assert obj.name == "new"
+
+    # The entry is also dropped when the counter expires without a save.
+    cache.delete(key)
+    assert get_cached(Item.objects.all(), sku="a")[1] == 1
+
+
+def test_object_cache_keeps_separate_keys_per_queryset(cached_item):
+    owner = User.objects.create(username="owner")
+    other = User.objects.create(username="other")
+    cached_item.owner = owner
+    cached_item.save()
+    lookup = CachedLookup()
+    owned = Item.objects.filter(owner=owner)
+    not_owned = Item.objects.filter(owner=other)
+    assert lookup.get_object_cache_key(owned, {"sku": "a"}) != (
+        lookup.get_object_cache_key(not_owned, {"sku": "a"})
+    )
+    assert get_cached(owned, sku="a")[0].pk == cached_item.pk
+    assert get_cached(owned, sku="a")[1] == 0
+    with pytest.raises(Http404):
+        get_cached(not_owned, sku="a")
@@ -0,0 +1,84 @@
+import json
+from base64 import b64encode
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from rest_framework_helpers.pagination import KeysetPagination
+
+from .models import Item
+
+
+def paginate(cursor=None, ordering="-quantity"):
+    params = {"page_size": 2}
+    if cursor is not None:
+        params["cursor"] = cursor
+    request = Request(APIRequestFactory().get("/", params))
+    view = type("View", (), {"order_by_field_name": ordering})()
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(Item.objects.all(), request, view)
+    return page, paginator.get_next_link(), paginator.get_previous_link()
+
+
+def get_cursor(link):
+    return parse_qs(urlparse(link).query)["cursor"][0]
+
+
+@pytest.fixture
+def items():
+    # Repeated quantities check the pk tiebreaker, and times that only differ by
+    # microseconds check that the cursor keeps their precision.
+    created = timezone.now().replace(microsecond=0)
+    return [
+        Item.objects.create(
+            sku=str(i),
+            name="item",
+            quantity=i % 3,
+            created=created + timedelta(microseconds=i),
+        )
+        for i in range(5)
+    ]
+
+
+@pytest.mark.parametrize(
+    "ordering,key",
+    [
+        ("-quantity", lambda x: (-x.quantity, -x.pk)),
+        ("-created", lambda x: (-x.created.timestamp(), -x.pk)),
+        ("created", lambda x: (x.created, x.pk)),
+    ],
+)
+def test_keyset_pagination_traverses_forwards_and_backwards(items, ordering, key):
+    expected = sorted(items, key=key)
+
+    pages = []
+    page, next_link, previous_link = paginate(ordering=ordering)
+    assert previous_link is None
+    pages.append(page)
+    while next_link is not None:
+        page, next_link, previous_link = paginate(get_cursor(next_link), ordering)
+        assert previous_link is not None
+        pages.append(page)
+    assert [len(x) for x in pages] == [2, 2, 1]
+    assert [x for page in pages for x in page] == expected
+
+    backwards = []
+    while previous_link is not None:
+        page, next_link, previous_link = paginate(get_cursor(previous_link), ordering)
+        assert next_link is not None
+        backwards.append(page)
+    assert backwards == pages[-2::-1]
+
+
+@pytest.mark.parametrize(
+    "data", [[["abc", 1], False], [[None, 1], False], [[1], False], "abc"]
+)
+def test_keyset_pagination_rejects_invalid_cursors(items, data):
+    cursor = b64encode(json.dumps(data).encode("utf-8")).decode("ascii")
+    with pytest.raises(NotFound):
+        paginate(cursor)
@@ -0,0 +1,75 @@
+import pytest
+from django.contrib.auth.models import User
+from rest_framework import generics, serializers
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from rest_framework_helpers.mixins import CheckQuerysetObjectPermissionsMixin
+from rest_framework_helpers.permissions import IsRelated
+
+from .models import Item, KeptItem
+
+
+class IsOwner(IsRelated):
+    target_field = "owner"
+
+
+class IsKeeper(IsRelated):
+    target_field = "keeper"
+
+
+class ItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Item
+        fields = ["sku"]
+
+
+def get_list(model, permission, user):
+    view = type(
+        "ItemList",
+        (CheckQuerysetObjectPermissionsMixin, generics.ListAPIView),
+        {
+            "queryset": model.objects.order_by("sku"),
+            "serializer_class": ItemSerializer,
+            "permission_classes": [permission],
+        },
+    )
+    request = APIRequestFactory().get("/")
+    force_authenticate(request, user=user)
+    return view.as_view()(request)
+
+
+@pytest.fixture
+def users():
+    owner = User.objects.create(username="owner")
+    other = User.objects.create(username="other")
+    Item.objects.create(sku="a", name="a", owner=owner)
+    Item.objects.create(sku="b", name="b", owner=other)
+    return owner, other
+
+
+def test_is_related_filters_model_fields_in_sql(users):
+    owner, _ = users
+    assert IsOwner().get_lookup(Item) == "owner"
+    response = get_list(Item, IsOwner, owner)
+    assert response.status_code == 200
+    assert [x["sku"] for x in response.data] == ["a"]
+
+
+def test_is_related_checks_attributes_per_object(users):
+    owner, _ = users
+    assert IsKeeper().get_lookup(KeptItem) is None
+    # The property can't be queried, so each object is checked and one fails.
+    response = get_list(KeptItem, IsKeeper, owner)
+    assert response.status_code == 403
+
+    KeptItem.objects.exclude(owner=owner).delete()
+    response = get_list(KeptItem, IsKeeper, owner)
+    assert response.status_code == 200
+    assert [x["sku"] for x in response.data] == ["a"]
+
+
+@pytest.mark.parametrize("target_field", ["name.foo", "missing", "owner.username"])
+def test_is_related_lookup_paths(target_field):
+    permission = type("Permission", (IsRelated,), {"target_field": target_field})()
+    expected = "owner__username" if target_field == "owner.username" else None
+    assert permission.get_lookup(Item) == expected
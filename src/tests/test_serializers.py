@@ -0,0 +1,67 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from rest_framework_helpers.mixins import GetOrCreateMixin
+from rest_framework_helpers.serializers import GetOrCreateListSerializer
+
+from .models import Item
+
+
+class ItemSerializer(GetOrCreateMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Item
+        fields = ["sku", "name", "quantity"]
+        list_serializer_class = GetOrCreateListSerializer
+
+
+def test_get_or_create_list_creates_new_items_in_bulk():
+    data = [{"sku": str(i), "name": "item", "quantity": i} for i in range(10)]
+    serializer = ItemSerializer(data=data, many=True)
+    with CaptureQueriesContext(connection) as context:
+        assert serializer.is_valid(), serializer.errors
+        instances = serializer.save()
+    inserts = [x for x in context.captured_queries if x["sql"].startswith("INSERT")]
+    assert len(inserts) == 1
+    assert [x.sku for x in instances] == [str(i) for i in range(10)]
+    assert Item.objects.count() == 10
+
+
+def test_get_or_create_list_matches_existing_items():
+    existing = Item.objects.create(sku="a", name="first", quantity=1)
+    data = [
+        {"sku": "a", "name": "first", "quantity": 1},
+        {"sku": "b", "name": "second", "quantity": 2},
+    ]
+    serializer = ItemSerializer(data=data, many=True)
+    with CaptureQueriesContext(connection) as context:
+        assert serializer.is_valid(), serializer.errors
+    # The existing items are found with one query for the whole list.
+    lookups = [x for x in context.captured_queries if "bulk_lookup" in x["sql"]]
+    assert len(lookups) == 1
+    instances = serializer.save()
+    assert instances[0].pk == existing.pk
+    assert instances[1].pk is not None
+    assert Item.objects.count() == 2
+
+
+def test_get_or_create_list_upserts_on_natural_key():
+    Item.objects.create(sku="a", name="old", quantity=1)
+
+    class UpsertSerializer(ItemSerializer):
+        natural_key_fields = ["sku"]
+
+        class Meta(ItemSerializer.Meta):
+            pass
+
+    data = [
+        {"sku": "a", "name": "new", "quantity": 5},
+        {"sku": "b", "name": "other", "quantity": 2},
+    ]
+    serializer = UpsertSerializer(data=data, many=True)
+    assert serializer.is_valid(), serializer.errors
+    instances = serializer.save()
+    assert [x.sku for x in instances] == ["a", "b"]
+    assert all(x.pk is not None for x in instances)
+    assert Item.objects.get(sku="a").name == "new"
+    assert Item.objects.count() == 2
@@ -0,0 +1,118 @@
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from django.urls import NoReverseMatch, reverse
+
+from rest_framework_helpers.utils import (
+    build_compiled_url,
+    bulk_upsert,
+    compile_url_pattern,
+    get_compiled_url,
+)
+
+from .models import Item
+
+
+def test_bulk_upsert_updates_conflicts():
+    existing = Item.objects.create(sku="a", name="old", quantity=1)
+    objs = [Item(sku="a", name="new", quantity=2), Item(sku="b", name="b", quantity=3)]
+    saved = bulk_upsert(Item, objs, ["sku"], ["name", "quantity"])
+    assert [x.sku for x in saved] == ["a", "b"]
+    existing.refresh_from_db()
+    assert (existing.name, existing.quantity) == ("new", 2)
+    assert Item.objects.count() == 2
+
+
+def test_bulk_upsert_ignores_conflicts_and_refetches_them():
+    existing = Item.objects.create(sku="a", name="old", quantity=1)
+    objs = [Item(sku="a", name="new", quantity=2), Item(sku="b", name="b", quantity=3)]
+    saved = bulk_upsert(Item, objs, ["sku"])
+    # The conflicting row is left alone, and returned in place of the new object.
+    assert saved[0].pk == existing.pk
+    assert saved[0].name == "old"
+    assert saved[1].pk == Item.objects.get(sku="b").pk
+    assert Item.objects.count() == 2
+
+
+def test_bulk_upsert_falls_back_to_update_or_create(monkeypatch):
+    monkeypatch.setattr(connection.features, "supports_update_conflicts", False)
+    monkeypatch.setattr(
+        connection.features, "supports_update_conflicts_with_target", False
+    )
+    monkeypatch.setattr(connection.features, "supports_ignore_conflicts", False)
+    existing = Item.objects.create(sku="a", name="old", quantity=1)
+    objs = [Item(sku="a", name="new", quantity=2), Item(sku="b", name="b", quantity=3)]
+    saved = bulk_upsert(Item, objs, ["sku"], ["name"])
+    assert saved[0].pk == existing.pk
+    assert saved[0].name == "new"
+    assert saved[0].quantity == 1
+    assert saved[1].pk is not None
+    assert Item.objects.count() == 2
+
+
+def reverse_or_none(view_name, url_kwargs, format=None):
+    if format:
+        url_kwargs = dict(url_kwargs, format=format)
+    try:
+        return reverse(view_name, kwargs=url_kwargs)
+    except NoReverseMatch:
+        return None
+
+
+@pytest.mark.parametrize(
+    "view_name,url_kwargs,format",
+    [
+        ("item-detail", {"sku": "abc"}, None),
+        ("item-detail", {"sku": "a b"}, None),
+        ("item-detail", {"sku": "x%y"}, None),
+        ("item-detail", {"sku": "caf\u00e9?#"}, None),
+        ("number-detail", {"pk": 12}, None),
+        ("number-detail", {"pk": "12"}, None),
+        ("thing", {"pk": "abc"}, None),
+        ("thing", {"pk": "abc"}, "json"),
+        ("thing", {"pk": "a b"}, "json"),
+        ("ns:item-detail", {"slug": "a-slug"}, None),
+        ("ns:owner-item-detail", {"owner": 3, "sku": "a b"}, None),
+    ],
+)
+def test_compiled_url_matches_reverse(view_name, url_kwargs, format):
+    compiled = get_compiled_url(view_name, tuple(url_kwargs), format)
+    assert compiled[0] is not None
+    url = build_compiled_url(compiled, url_kwargs, format)
+    assert url is not None
+    assert url == reverse_or_none(view_name, url_kwargs, format)
+
+
+@pytest.mark.parametrize(
+    "view_name,url_kwargs,format",
+    [
+        ("item-detail", {"sku": "a/b"}, None),
+        ("number-detail", {"pk": "x"}, None),
+        ("thing", {"pk": "a.b"}, None),
+        ("thing", {"pk": "a/b"}, "json"),
+        ("ns:item-detail", {"slug": "not a slug"}, None),
+        ("ns:owner-item-detail", {"owner": "me", "sku": "abc"}, None),
+    ],
+)
+def test_compiled_url_falls_back_when_reverse_would_reject(
+    view_name, url_kwargs, format
+):
+    compiled = get_compiled_url(view_name, tuple(url_kwargs), format)
+    assert build_compiled_url(compiled, url_kwargs, format) is None
+    assert reverse_or_none(view_name, url_kwargs, format) is None
+
+
+def test_compiled_url_builds_absolute_urls():
+    request = RequestFactory().get("/", secure=True)
+    compiled = get_compiled_url("ns:item-detail", ("slug",))
+    url = build_compiled_url(compiled, {"slug": "a"}, request=request)
+    assert url == request.build_absolute_uri(reverse("ns:item-detail", args=["a"]))
+
+
+def test_compile_url_pattern_matches_reverse_for_format_suffixes():
+    assert compile_url_pattern("thing", ("pk",), "json") is not None
+    assert compile_url_pattern("thing", ("pk",)) is not None
+    # There is no pattern for these kwargs, so reverse() fails as well.
+    assert compile_url_pattern("item-detail", ("pk",)) is None
+    assert reverse_or_none("item-detail", {"pk": 1}) is None
+    assert compile_url_pattern("missing:item-detail", ("sku",)) is None
@@ -0,0 +1,46 @@
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from rest_framework_helpers.views import APIRootView
+
+
+class RootView(APIRootView):
+    endpoints = {"items": "item-list"}
+    renderer_classes = [JSONRenderer, BrowsableAPIRenderer]
+
+
+def get(**headers):
+    request = APIRequestFactory().get("/", **headers)
+    response = RootView.as_view()(request)
+    if hasattr(response, "render"):
+        response.render()
+    return response
+
+
+def test_api_root_lists_endpoints_with_an_etag():
+    response = get()
+    assert response.status_code == 200
+    assert response.data == {"items": "http://testserver/items/"}
+    assert response["ETag"]
+
+
+def test_api_root_not_modified_has_no_body():
+    for accept in ("application/json", "text/html"):
+        etag = get(HTTP_ACCEPT=accept)["ETag"]
+        response = get(HTTP_ACCEPT=accept, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+        assert response.content == b""
+
+
+def test_api_root_uses_overridden_endpoints():
+    class ExtraRootView(RootView):
+        def get_endpoints(self, request, format):
+            endpoints = dict(super().get_endpoints(request, format))
+            endpoints["extra"] = "http://testserver/extra/"
+            return endpoints
+
+    request = APIRequestFactory().get("/", HTTP_ACCEPT="application/json")
+    response = ExtraRootView.as_view()(request)
+    assert response.data["extra"] == "http://testserver/extra/"
+    assert response["ETag"] != get(HTTP_ACCEPT="application/json")["ETag"]
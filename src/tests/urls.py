@@ -0,0 +1,23 @@
+from django.urls import include, path, re_path
+
+
+def view(request, **kwargs):
+    pass
+
+
+namespaced = (
+    [
+        path("items/<slug:slug>/", view, name="item-detail"),
+        path("owners/<int:owner>/items/<str:sku>/", view, name="owner-item-detail"),
+    ],
+    "items",
+)
+
+urlpatterns = [
+    path("items/", view, name="item-list"),
+    path("items/<str:sku>/", view, name="item-detail"),
+    path("numbers/<int:pk>/", view, name="number-detail"),
+    re_path(r"^things/(?P<pk>[^/.]+)\.(?P<format>[a-z0-9]+)/?$", view, name="thing"),
+    re_path(r"^things/(?P<pk>[^/.]+)/$", view, name="thing"),
+    path("ns/", include(namespaced, namespace="ns")),
+]